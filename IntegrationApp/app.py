@@ -1,9 +1,16 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import networkx as nx
-from pyvis.network import Network
-import tempfile
-import os
+from network_graph import DEFAULT_COLOR, LAYOUT_STYLES, VIEW_MODES, generate_network_html, summarize_integrations
+from lineage import LineageIndex
+from changes import cascade_renames, editor_changes
+from bulk import FORMATS, assign_ids, detect_format, export_bytes, read_batch, validate_batch
+from indexes import HashIndex
+from metrics import EXPORT_FORMATS, RECORDER, timed
+from report_lineage import DEFAULT_REPORT_METADATA, DEFAULT_REPORTS_FOLDER, ReportLineage, load_scan_service
+from search import SearchIndex
+from storage import CONNECTION_TYPES, FILES, OWNER_ROLES, SharedFrames, storage_from_env
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -13,40 +20,108 @@ st.set_page_config(
 )
 
 # --- DATA PERSISTENCE FUNCTIONS ---
-FILES = {
-    "groups": "data_groups.csv",
-    "systems": "data_systems.csv",
-    "owners": "data_owners.csv",
-    "integrations": "data_integrations.csv"
-}
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    return storage_from_env()
+
+@st.cache_resource(show_spinner=False)
+def get_shared_frames():
+    return SharedFrames(get_storage())
 
 def load_data(key):
-    if not os.path.exists(FILES[key]):
-        if key == "groups": return pd.DataFrame(columns=["Group Name", "Description"])
-        if key == "systems": return pd.DataFrame(columns=["System Name", "Description", "Group", "Color"])
-        if key == "owners": return pd.DataFrame(columns=["Name", "Email", "Role"])
-        if key == "integrations": return pd.DataFrame(columns=["ID", "Integration Name", "Description", "Source System", "Source Conn", "Target System", "Target Conn", "Business Owner", "IT Owner"])
-        return pd.DataFrame()
-    
-    df = pd.read_csv(FILES[key])
-    if key == "integrations" and "Description" not in df.columns:
-        df["Description"] = ""
+    with timed("load_data", table=key) as sizes:
+        df = get_shared_frames().get(key)
+        sizes["rows"] = len(df)
     return df
 
+def data_changed(key, df, before=None, labels=None):
+    # Only systems and integrations feed the graph; with a change set
+    # (labels) the indexes are updated for those rows alone
+    if key in ("systems", "integrations", "report_mappings"):
+        cached_network_html.clear()
+        cached_integration_summary.clear()
+    cached_export.clear()
+    if key == "integrations":
+        if labels is None:
+            get_lineage_index().sync(df)
+            get_search_index().sync(df)
+        else:
+            get_lineage_index().apply_rows(before, df, labels)
+            get_search_index().update_rows(before, df, labels)
+
 def save_data(key, df):
-    df.to_csv(FILES[key], index=False)
+    with timed("save_data", table=key, rows=len(df)):
+        get_storage().save(key, df)
+    get_shared_frames().put(key, df)
+    data_changed(key, df)
+
+def insert_data(key, new_rows):
+    current = load_data(key)
+    get_storage().insert(key, new_rows)
+    df = pd.concat([current, new_rows], ignore_index=True)
+    get_shared_frames().put(key, df)
+    st.session_state[key] = df
+    data_changed(key, df)
+
+def persist_changes(change, before, after):
+    with timed("save_data", table=change.key, rows=len(change.labels)):
+        if change.addressable:
+            get_storage().apply_changes(change.key, change.added, change.updated, change.deleted)
+        else:
+            get_storage().save(change.key, after)
+    get_shared_frames().put(change.key, after)
+    st.session_state[change.key] = after
+    data_changed(change.key, after, before, change.labels)
+
+def save_editor_changes(key, widget_key, edited_df):
+    # Persists only the rows added/edited/deleted in the data_editor, then
+    # carries key renames over to the tables that reference them
+    before = st.session_state[key]
+    change = editor_changes(key, before, edited_df, st.session_state.get(widget_key, {}))
+    if not change:
+        return 0
+    persist_changes(change, before, edited_df)
+    for cascade, ref_before, ref_after in cascade_renames(change, {k: load_data(k) for k in FILES}):
+        persist_changes(cascade, ref_before, ref_after)
+    return len(change.labels)
+
+# Built once per server process from the file on disk, then updated
+# incrementally on every save instead of being rebuilt on every render.
+@st.cache_resource(show_spinner=False)
+def get_lineage_index():
+    return LineageIndex.from_integrations(load_data("integrations"))
+
+@st.cache_resource(show_spinner=False)
+def get_search_index():
+    return SearchIndex.from_frame(load_data("integrations"))
+
+# Hash indexes keyed by integration name / system name, rebuilt only
+# when the shared frame they point at is replaced
+@st.cache_resource(show_spinner=False)
+def get_hash_indexes():
+    return {
+        "integration_name": HashIndex("Integration Name"),
+        "system_name": HashIndex("System Name")
+    }
+
+def lookup_index(name, df):
+    return get_hash_indexes()[name].sync(df)
+
+# Report -> table -> system join over the ReportTracing output
+# (INTEGRATION_APP_REPORT_METADATA), redone only after a new scan or a
+# mapping change
+@st.cache_resource(show_spinner=False)
+def get_report_lineage():
+    return ReportLineage(os.environ.get("INTEGRATION_APP_REPORT_METADATA", DEFAULT_REPORT_METADATA))
+
+def report_lineage():
+    return get_report_lineage().sync(load_data("report_mappings"))
 
 # --- INITIALIZE STATE ---
+# Sessions hold references to the shared frames (no per-session copies) and
+# pick up saves from other sessions on their next rerun.
 for key in FILES.keys():
-    if key not in st.session_state:
-        st.session_state[key] = load_data(key)
-
-# --- CONSTANTS ---
-CONNECTION_TYPES = [
-    "API", "Database", "Lakehouse", "Report", 
-    "Event Streams", "CSV File", "Manual Integration", "Web Services"
-]
-DEFAULT_COLOR = "#D3D3D3"
+    st.session_state[key] = load_data(key)
 
 # ==========================================
 # SIDEBAR & FULLSCREEN LOGIC
@@ -64,6 +139,20 @@ with st.sidebar:
     
     st.info("Toggle this on to hide data entry tabs and expand the network view.")
 
+    # INTEGRATION_APP_ADMIN=1 shows the timing panel (samples are always recorded)
+    if os.environ.get("INTEGRATION_APP_ADMIN") == "1":
+        with st.expander("📈 Performance (admin)", expanded=False):
+            perf_summary = RECORDER.summary()
+            if perf_summary.empty:
+                st.caption("No samples recorded yet.")
+            else:
+                st.dataframe(perf_summary, use_container_width=True, hide_index=True)
+            st.caption(f"Last {len(RECORDER.samples)} of up to {RECORDER.samples.maxlen} calls, all sessions.")
+            log_format = st.selectbox("Log format", EXPORT_FORMATS, key="perf_log_format")
+            st.download_button("⬇️ Export Timings", data=RECORDER.export(log_format), file_name=f"timings.{log_format}")
+            if st.button("Clear Timings"):
+                RECORDER.clear()
+
 # ==========================================
 # MAIN HEADER
 # ==========================================
@@ -72,158 +161,28 @@ if not fullscreen_mode:
     st.markdown("Map your system landscape, integrations, and dependencies.")
     st.divider()
 
-# ==========================================
-# HELPER: GENERATE NETWORK HTML
-# ==========================================
-def generate_network_html(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px):
-    
-    G = nx.MultiDiGraph() # Grafo Multi-Direcionado
-    
-    # 1. Add Nodes
-    for _, row in df_sys.iterrows():
-        if selected_group and row['Group'] not in selected_group:
-            continue
-        
-        tooltip = f"<b>{row['System Name']}</b><br>Group: {row['Group']}<br>{row['Description']}"
-        
-        raw_color = row['Color']
-        final_color = DEFAULT_COLOR
-        if pd.notna(raw_color) and str(raw_color).strip() != "":
-                final_color = raw_color
-        
-        G.add_node(
-            row['System Name'], 
-            label=row['System Name'], 
-            title=tooltip, 
-            color=final_color, 
-            group=row['Group'], 
-            shape="dot", 
-            size=25,
-            font={'size': 16, 'color': 'white'} # Fonte definida no nó
-        )
-
-    # --- TRACKER PARA CURVATURA ---
-    edge_tracker = {} 
-
-    # 2. Add Edges
-    for _, row in df_int.iterrows():
-        if row['Source System'] in G.nodes and row['Target System'] in G.nodes:
-            
-            # Identifica par único (Origem -> Destino)
-            pair_key = (row['Source System'], row['Target System'])
-            idx = edge_tracker.get(pair_key, 0)
-            edge_tracker[pair_key] = idx + 1
-            
-            # --- CÁLCULO DE CURVATURA (ZIG-ZAG ROBUSTO) ---
-            # Para garantir que linhas não se sobreponham, alternamos lados e aumentamos o arco.
-            
-            # Se for a 1ª linha (idx 0): Curvatura 0.2
-            # Se for a 2ª linha (idx 1): Curvatura -0.2
-            # Se for a 3ª linha (idx 2): Curvatura 0.4
-            # Se for a 4ª linha (idx 3): Curvatura -0.4
-            
-            base_curve = 0.2
-            step = 0.15 # Passo maior para visibilidade
-            
-            direction = 1 if idx % 2 == 0 else -1
-            magnitude = base_curve + ((idx // 2) * step)
-            roundness_val = magnitude * direction
-
-            connection_label = f"{row['Source Conn']} / {row['Target Conn']}"
-            
-            edge_tooltip = f"""
-            <b>{row['Integration Name']}</b><br>
-            {row['Description']}<br>
-            <hr>
-            Type: {row['Source Conn']} ➔ {row['Target Conn']}<br>
-            Biz Owner: {row['Business Owner']}<br>
-            IT Owner: {row['IT Owner']}
-            """
-            
-            # AQUI: Definimos TUDO sobre a aresta localmente para evitar override global
-            G.add_edge(
-                row['Source System'], 
-                row['Target System'], 
-                title=edge_tooltip, 
-                label=connection_label,
-                color={'inherit': 'from'},
-                font={'size': 10, 'color': 'white', 'strokeWidth': 2, 'strokeColor': '#222222', 'align': 'middle'},
-                smooth={'type': 'curvedCW', 'roundness': roundness_val}, # Força Curvatura Manual
-                arrows={'to': {'enabled': True, 'scaleFactor': 1}}
-            )
+# --- RENDER CACHE ---
+# st.cache_data keys on a content hash of both frames plus every render
+# argument, so tab switches and unrelated widgets reuse the HTML. Entries are
+# evicted LRU past RENDER_CACHE_ENTRIES and the whole cache is dropped on save.
+# Streamlit only sample-hashes large frames, so data_version (the storage
+# stamps of both tables) also catches outside writes that keep the shape.
+RENDER_CACHE_ENTRIES = 32
 
-    # 3. Focus Logic
-    if view_mode == "Focus System (Lineage)" and focus_node:
-        if focus_node in G:
-            upstream = list(G.predecessors(focus_node))
-            downstream = list(G.successors(focus_node))
-            nodes_to_keep = set([focus_node] + upstream + downstream)
-            G = G.subgraph(list(nodes_to_keep))
-
-    # 4. Generate PyVis
-    if len(G.nodes) > 0:
-        net = Network(height=f'{height_px}px', width='100%', bgcolor='#222222', font_color='white', directed=True)
-        net.from_nx(G)
-        
-        # --- OPTIONS LOGIC (SEM BLOCO DE EDGES GLOBAL) ---
-        # Removemos a configuração global de 'edges' e 'smooth' para respeitar a configuração individual acima.
-        
-        if layout_style == "Hierarchical (Bottom-Up)":
-            options_script = """
-            var options = {
-              "layout": {
-                "hierarchical": {
-                  "enabled": true,
-                  "direction": "DU",
-                  "sortMethod": "directed",
-                  "nodeSpacing": 350,
-                  "levelSeparation": 300,
-                  "blockShifting": true,
-                  "edgeMinimization": false
-                }
-              },
-              "physics": {
-                "enabled": false
-              },
-              "nodes": { 
-                "borderWidth": 2, 
-                "shadow": true
-              }
-            }
-            """
-        else:
-            # Organic
-            options_script = """
-            var options = {
-              "nodes": { 
-                "borderWidth": 2,
-                "shadow": true
-              },
-              "physics": { 
-                "barnesHut": { 
-                    "gravitationalConstant": -3000, 
-                    "centralGravity": 0.3, 
-                    "springLength": 300, 
-                    "springConstant": 0.001, 
-                    "damping": 0.5,
-                    "avoidOverlap": 0.2
-                }, 
-                "minVelocity": 0.75 
-              }
-            }
-            """
+def graph_data_version():
+    storage = get_storage()
+    return (storage.version("systems"), storage.version("integrations"))
 
-        net.set_options(options_script)
-        
-        try:
-            path = os.path.join(tempfile.gettempdir(), "network_v13.html")
-            net.save_graph(path)
-            with open(path, 'r', encoding='utf-8') as f: 
-                return f.read()
-        except Exception as e: 
-            return f"Error: {e}"
-    else:
-        return None
+# _lineage and _summary are derived from the frames, so they are left out of the cache key;
+# _reports is keyed by reports_version instead.
+@st.cache_data(max_entries=RENDER_CACHE_ENTRIES, show_spinner=False)
+def cached_network_html(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px, lineage_depth=1, _lineage=None, expanded_groups=None, _summary=None, compact=False, _reports=None, reports_version=None, data_version=None):
+    return generate_network_html(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px, lineage_depth, _lineage, expanded_groups, _summary, compact, _reports)
+
+# Group-to-group edge summary for the level-of-detail view, once per data version
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_integration_summary(df_sys, df_int, data_version=None):
+    return summarize_integrations(df_sys, df_int)
 
 # ==========================================
 # HELPER: RENDER UI
@@ -240,26 +199,158 @@ def render_visualizer_ui(height_px):
     
     with c_filter1:
         st.markdown("### 🔍 Controls")
-        layout_style = st.radio("Layout Style", ["Organic (Neural)", "Hierarchical (Bottom-Up)"])
-        view_mode = st.radio("View Mode", ["Full Network", "Focus System (Lineage)"])
+        layout_style = st.radio("Layout Style", LAYOUT_STYLES)
+        view_mode = st.radio("View Mode", VIEW_MODES)
+        compact = st.toggle("⚡ Compact Payload", value=False, help="Shared styling in global options and edge tooltips loaded on hover. Recommended for large graphs.")
         selected_group = st.multiselect("Filter by Group", df_sys['Group'].unique())
+        reports = report_lineage()
+        show_reports = st.toggle("📊 Show Power BI Reports", value=False, disabled=not reports,
+                                 help="Reports from the ReportTracing scan, linked to systems through the report mapping (Systems tab).")
+
+        expanded_groups = []
+        summary = None
+        if view_mode == "Group Overview (LOD)":
+            summary = cached_integration_summary(df_sys, df_int, graph_data_version())
+            expand_options = selected_group or list(df_sys['Group'].dropna().unique())
+            expanded_groups = st.multiselect("Expand Groups", expand_options, help="Show the individual systems of these groups.")
         
         focus_node = None
+        lineage_depth = 1
+        # Catches reloads of the shared frame after outside writes (bulk CLI,
+        # other server processes), not just saves made in this process
+        lineage = get_lineage_index().sync(df_int)
         if view_mode == "Focus System (Lineage)":
             focus_node = st.selectbox("Select System to Focus", df_sys['System Name'].unique())
+            depth_choice = st.select_slider("Lineage Depth (hops)", options=[1, 2, 3, 4, 5, "All"], value=1)
+            lineage_depth = None if depth_choice == "All" else depth_choice
+
+            if focus_node:
+                upstream = lineage.upstream_of(focus_node, lineage_depth)
+                downstream = lineage.downstream_of(focus_node, lineage_depth)
+                st.caption(f"⬆️ {len(upstream)} upstream · ⬇️ {len(downstream)} downstream")
+                with st.expander("💥 Impact Analysis"):
+                    st.markdown(f"Systems affected if **{focus_node}** goes down:")
+                    if downstream:
+                        impact = pd.DataFrame(sorted(downstream.items(), key=lambda item: (item[1], str(item[0]))), columns=["System", "Hops"])
+                        st.dataframe(impact, use_container_width=True, hide_index=True)
+                    else:
+                        st.write("No downstream systems.")
+                    if reports:
+                        affected_reports = reports.reports_of({focus_node} | set(downstream))
+                        st.markdown(f"Power BI reports affected: **{len(affected_reports)}**")
+                        if affected_reports:
+                            st.dataframe(pd.DataFrame(sorted(affected_reports), columns=["Report"]), use_container_width=True, hide_index=True)
 
     with c_filter2:
-        html_data = generate_network_html(
-            df_sys, df_int, 
-            layout_style, view_mode, focus_node, selected_group, 
-            height_px 
-        )
+        # Includes cache hits, unlike the generate_network_html samples
+        with timed("render_network", view=view_mode) as sizes:
+            html_data = cached_network_html(
+                df_sys, df_int, 
+                layout_style, view_mode, focus_node, selected_group, 
+                height_px, lineage_depth, lineage,
+                expanded_groups, summary, compact,
+                reports if show_reports else None, reports.version if show_reports else None,
+                graph_data_version()
+            )
+            sizes["bytes"] = len(html_data or "")
         
         if html_data:
             st.components.v1.html(html_data, height=height_px + 10)
         else:
             st.warning("No data matches filters.")
 
+# ==========================================
+# HELPER: BULK IMPORT / EXPORT
+# ==========================================
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_export(key, fmt, version):
+    # version: the storage stamp of the table, so outside writes picked up
+    # by the shared frames also refresh the export
+    return export_bytes(load_data(key), fmt)
+
+def render_bulk_io(key):
+    with st.expander("📦 Bulk Import / Export", expanded=False):
+        c_import, c_export = st.columns([2, 1])
+        with c_import:
+            # Bumped after an import so the uploader comes back empty instead
+            # of re-validating the batch that was just saved
+            round_key = f"bulk_upload_round_{key}"
+            upload_round = st.session_state.get(round_key, 0)
+            upload = st.file_uploader("Import a CSV, JSON or Parquet batch", type=FORMATS, key=f"bulk_upload_{key}_{upload_round}")
+            if upload is not None:
+                try:
+                    batch = read_batch(upload, detect_format(upload.name))
+                    rows, messages = validate_batch(key, batch, {k: load_data(k) for k in FILES})
+                except Exception as e:
+                    st.error(f"Could not read file: {e}")
+                    rows, messages = None, []
+                for message in messages:
+                    if rows is None:
+                        st.error(message)
+                    else:
+                        st.warning(message)
+                if rows is not None:
+                    st.dataframe(rows.head(50), use_container_width=True, hide_index=True)
+                    if st.button(f"Import {len(rows)} rows", key=f"bulk_apply_{key}"):
+                        if key == "integrations":
+                            rows = assign_ids(rows, get_storage().next_ids("integrations", len(rows)))
+                        insert_data(key, rows)
+                        st.session_state[round_key] = upload_round + 1
+                        st.success(f"Imported {len(rows)} rows!")
+                        st.rerun()
+        with c_export:
+            fmt = st.selectbox("Export format", FORMATS, key=f"bulk_format_{key}")
+            try:
+                st.download_button("⬇️ Export", data=cached_export(key, fmt, get_storage().version(key)), file_name=f"{key}.{fmt}", key=f"bulk_export_{key}")
+            except ImportError as e:
+                st.warning(str(e))
+
+# ==========================================
+# HELPER: BACKGROUND REPORT SCAN
+# ==========================================
+# One scan at a time per server process, shared by all sessions. The scan
+# writes to the metadata file ReportLineage watches, so the report layer
+# picks the new output up on the next rerun.
+@st.cache_resource(show_spinner=False)
+def get_scan_state():
+    return {"job": None}
+
+def render_scan_progress():
+    job = get_scan_state()["job"]
+    if job is None:
+        return
+    snapshot = job.progress.snapshot()
+    service = load_scan_service()
+    st.progress(min(1.0, snapshot["fraction"]), text=f"Scan {snapshot['state']}: {service.format_progress(snapshot)}")
+    if not job.done():
+        if st.button("⏹️ Cancel Scan"):
+            job.cancel()
+        return
+    if job.progress.errors:
+        st.dataframe(pd.DataFrame(job.progress.errors), use_container_width=True, hide_index=True)
+    if st.session_state.get("scan_seen") != id(job):
+        # Finished since this session last looked: rerun the whole app so
+        # the report layer and mapping stats reload
+        st.session_state["scan_seen"] = id(job)
+        st.rerun()
+
+def render_report_scan(reports):
+    service = load_scan_service()
+    if service is None:
+        st.caption("ReportTracing is not available next to this app, so rescans are disabled.")
+        return
+    state = get_scan_state()
+    running = state["job"] is not None and not state["job"].done()
+    folder = st.text_input("Reports folder", os.environ.get("INTEGRATION_APP_REPORTS_DIR", DEFAULT_REPORTS_FOLDER), key="scan_folder")
+    if st.button("🔄 Rescan Reports", disabled=running):
+        if not os.path.isdir(folder):
+            st.error(f"Folder not found: {folder}")
+        else:
+            state["job"] = service.start_scan(folder, reports.metadata_path)
+            st.rerun()
+    # Polls once a second while a scan runs; the rest of the page stays idle
+    st.fragment(render_scan_progress, run_every=1.0 if running else None)()
+
 # ==========================================
 # MAIN LOGIC FLOW
 # ==========================================
@@ -277,6 +368,7 @@ else:
     # ---------------------------------
     with tab_groups:
         st.header("System Groups Management")
+        render_bulk_io("groups")
         col_add, col_edit = st.columns([1, 2])
         
         with col_add:
@@ -290,8 +382,7 @@ else:
                         st.error("Group exists.")
                     else:
                         new_row = pd.DataFrame([{"Group Name": g_name, "Description": g_desc}])
-                        st.session_state['groups'] = pd.concat([st.session_state['groups'], new_row], ignore_index=True)
-                        save_data("groups", st.session_state['groups'])
+                        insert_data("groups", new_row)
                         st.success("Added!")
                         st.rerun()
 
@@ -299,15 +390,15 @@ else:
             st.subheader("Edit Existing Groups")
             edited_groups = st.data_editor(st.session_state['groups'], num_rows="dynamic", use_container_width=True, key="edit_groups_table")
             if st.button("💾 Save Groups Changes"):
-                st.session_state['groups'] = edited_groups
-                save_data("groups", st.session_state['groups'])
-                st.success("Groups updated!")
+                saved = save_editor_changes("groups", "edit_groups_table", edited_groups)
+                st.success(f"Groups updated! ({saved} rows changed)")
 
     # ---------------------------------
     # TAB 2: OWNERS
     # ---------------------------------
     with tab_owners:
         st.header("Stakeholder Registry")
+        render_bulk_io("owners")
         col_add, col_edit = st.columns([1, 2])
         
         with col_add:
@@ -315,29 +406,28 @@ else:
             with st.form("owner_form"):
                 o_name = st.text_input("Name")
                 o_email = st.text_input("Email")
-                o_role = st.selectbox("Role", ["Business Owner", "IT Owner"])
+                o_role = st.selectbox("Role", OWNER_ROLES)
                 submitted = st.form_submit_button("Add")
                 if submitted and o_name:
                     new_row = pd.DataFrame([{"Name": o_name, "Email": o_email, "Role": o_role}])
-                    st.session_state['owners'] = pd.concat([st.session_state['owners'], new_row], ignore_index=True)
-                    save_data("owners", st.session_state['owners'])
+                    insert_data("owners", new_row)
                     st.success("Owner added!")
                     st.rerun()
 
         with col_edit:
             st.subheader("Edit Owners")
-            column_config_owners = {"Role": st.column_config.SelectboxColumn(options=["Business Owner", "IT Owner"])}
+            column_config_owners = {"Role": st.column_config.SelectboxColumn(options=OWNER_ROLES)}
             edited_owners = st.data_editor(st.session_state['owners'], column_config=column_config_owners, num_rows="dynamic", use_container_width=True, key="edit_owners_table")
             if st.button("💾 Save Owners Changes"):
-                st.session_state['owners'] = edited_owners
-                save_data("owners", st.session_state['owners'])
-                st.success("Owners updated!")
+                saved = save_editor_changes("owners", "edit_owners_table", edited_owners)
+                st.success(f"Owners updated! ({saved} rows changed)")
 
     # ---------------------------------
     # TAB 3: SYSTEMS
     # ---------------------------------
     with tab_systems:
         st.header("Systems Inventory")
+        render_bulk_io("systems")
         col_add, col_edit = st.columns([1, 2])
         
         with col_add:
@@ -352,12 +442,11 @@ else:
                     s_color = st.color_picker("Node Color (Default: Light Gray)", DEFAULT_COLOR)
                     submitted = st.form_submit_button("Register System")
                     if submitted and s_name:
-                        if s_name in st.session_state['systems']['System Name'].values:
+                        if s_name in lookup_index("system_name", st.session_state['systems']):
                             st.error("System exists.")
                         else:
                             new_row = pd.DataFrame([{"System Name": s_name, "Description": s_desc, "Group": s_group, "Color": s_color}])
-                            st.session_state['systems'] = pd.concat([st.session_state['systems'], new_row], ignore_index=True)
-                            save_data("systems", st.session_state['systems'])
+                            insert_data("systems", new_row)
                             st.success("System added!")
                             st.rerun()
 
@@ -370,15 +459,44 @@ else:
                 }
                 edited_systems = st.data_editor(st.session_state['systems'], column_config=column_config_sys, num_rows="dynamic", use_container_width=True, key="edit_systems_table")
                 if st.button("💾 Save Systems Changes"):
-                    st.session_state['systems'] = edited_systems
-                    save_data("systems", st.session_state['systems'])
-                    st.success("Systems updated!")
+                    duplicates = HashIndex.from_frame(edited_systems, "System Name").duplicates()
+                    if duplicates:
+                        st.error(f"Error: Duplicate System Names detected: {', '.join(map(str, duplicates))}")
+                    else:
+                        # Renamed systems are also renamed in Source/Target System of the integrations
+                        saved = save_editor_changes("systems", "edit_systems_table", edited_systems)
+                        st.success(f"Systems updated! ({saved} rows changed)")
+
+        with st.expander("📊 Report Lineage Mapping", expanded=False):
+            st.markdown("Map each Power BI table (`Entity` in the ReportTracing output) to the system that hosts it.")
+            reports = report_lineage()
+            if reports.error:
+                st.error(f"Could not read the report scan: {reports.error}")
+            elif reports.usage.empty:
+                st.info(f"No report scan found at `{reports.metadata_path}`.")
+            else:
+                unmapped = reports.unmapped_entities(st.session_state['report_mappings'])
+                st.caption(f"{reports.usage['Report'].nunique()} reports, {reports.usage['Entity'].nunique()} tables, {len(unmapped)} unmapped")
+                if unmapped:
+                    st.caption("Unmapped: " + ", ".join(map(str, unmapped[:50])))
+            render_report_scan(reports)
+            system_names = list(st.session_state['systems']['System Name'].dropna().unique())
+            column_config_map = {"System": st.column_config.SelectboxColumn(options=system_names, required=True)}
+            edited_mappings = st.data_editor(st.session_state['report_mappings'], column_config=column_config_map, num_rows="dynamic", use_container_width=True, key="edit_report_mappings_table")
+            if st.button("💾 Save Report Mapping"):
+                duplicates = HashIndex.from_frame(edited_mappings, "Entity").duplicates()
+                if duplicates:
+                    st.error(f"Error: Tables mapped more than once: {', '.join(map(str, duplicates))}")
+                else:
+                    saved = save_editor_changes("report_mappings", "edit_report_mappings_table", edited_mappings)
+                    st.success(f"Report mapping updated! ({saved} rows changed)")
 
     # ---------------------------------
     # TAB 4: INTEGRATIONS
     # ---------------------------------
     with tab_integrations:
         st.header("Integration Management")
+        render_bulk_io("integrations")
         system_list = list(st.session_state['systems']['System Name'].unique()) if not st.session_state['systems'].empty else []
         biz_owners = list(st.session_state['owners'][st.session_state['owners']['Role'] == "Business Owner"]['Name'].unique()) if not st.session_state['owners'].empty else []
         it_owners = list(st.session_state['owners'][st.session_state['owners']['Role'] == "IT Owner"]['Name'].unique()) if not st.session_state['owners'].empty else []
@@ -402,18 +520,17 @@ else:
                     io = c4.selectbox("IT Owner", it_owners) if it_owners else c4.text_input("IT Owner")
                     submitted = st.form_submit_button("Create Integration")
                     if submitted and i_name:
-                        if i_name in st.session_state['integrations']['Integration Name'].values:
+                        if i_name in lookup_index("integration_name", st.session_state['integrations']):
                             st.error("Integration Name already exists.")
                         else:
-                            new_id = len(st.session_state['integrations']) + 1
+                            new_id = get_storage().next_ids("integrations")[0]
                             new_row = pd.DataFrame([{
                                 "ID": new_id, "Integration Name": i_name, "Description": i_desc,
                                 "Source System": src_sys, "Source Conn": src_conn,
                                 "Target System": tgt_sys, "Target Conn": tgt_conn,
                                 "Business Owner": bo, "IT Owner": io
                             }])
-                            st.session_state['integrations'] = pd.concat([st.session_state['integrations'], new_row], ignore_index=True)
-                            save_data("integrations", st.session_state['integrations'])
+                            insert_data("integrations", new_row)
                             st.success("Integration Created!")
                             st.rerun()
         st.divider()
@@ -421,8 +538,17 @@ else:
         search_term = st.text_input("Type to search...", placeholder="e.g., 'API', 'Finance'")
         df_integrations = st.session_state['integrations']
         if search_term:
-            mask = df_integrations.astype(str).apply(lambda x: x.str.contains(search_term, case=False)).any(axis=1)
-            st.dataframe(df_integrations[mask], use_container_width=True, hide_index=True)
+            # Prefix match per word, all words required, best matches first
+            with timed("search", rows=len(df_integrations)) as sizes:
+                search_index = get_search_index()
+                search_index.sync(df_integrations)
+                hits = search_index.search(search_term)
+                sizes["hits"] = len(hits)
+            if hits:
+                st.caption(f"{len(hits)} matching integrations")
+                st.dataframe(df_integrations.loc[hits], use_container_width=True, hide_index=True)
+            else:
+                st.warning("No integrations match your search.")
         else:
             st.info("Enter text to search.")
         st.divider()
@@ -441,11 +567,24 @@ else:
             }
             edited_df = st.data_editor(df_integrations, column_config=column_config, num_rows="dynamic", use_container_width=True, key="editor_integrations_main")
             if st.button("💾 Save Integration Changes"):
-                if len(edited_df['Integration Name']) != len(edited_df['Integration Name'].unique()):
-                    st.error("Error: Duplicate Integration Names detected.")
+                duplicates = HashIndex.from_frame(edited_df, "Integration Name").duplicates()
+                if duplicates:
+                    st.error(f"Error: Duplicate Integration Names detected: {', '.join(map(str, duplicates))}")
                 else:
-                    st.session_state['integrations'] = edited_df
-                    save_data("integrations", st.session_state['integrations'])
+                    # Rows added in the editor have no ID yet (the column is read-only), and
+                    # older files may hold duplicate IDs: both get fresh ones from the sequence
+                    id_index = HashIndex.from_frame(edited_df, "ID")
+                    relabel = list(edited_df.index[edited_df['ID'].isna()])
+                    relabel += [label for value in id_index.duplicates() for label in id_index.get(value)[1:]]
+                    if relabel:
+                        edited_df = edited_df.copy()
+                        edited_df.loc[relabel, 'ID'] = get_storage().next_ids("integrations", len(relabel))
+                    if df_integrations.index.isin(relabel).any():
+                        # Existing rows were renumbered: rewrite the whole table
+                        st.session_state['integrations'] = edited_df
+                        save_data("integrations", st.session_state['integrations'])
+                    else:
+                        save_editor_changes("integrations", "editor_integrations_main", edited_df)
                     st.success("All changes saved!")
                     st.rerun()
 
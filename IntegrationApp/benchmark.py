@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+
+import networkx as nx
+import pandas as pd
+
+from network_graph import DEFAULT_COLOR, LAYOUT_STYLES, VIEW_MODES, build_graph, build_pyvis_network, generate_network_html
+from search import SearchIndex
+from storage import CONNECTION_TYPES, FILES, OWNER_ROLES, CsvStorage, SharedFrames, SqliteStorage
+
+N_OWNERS = 50
+
+# --- SYNTHETIC DATA ---
+def make_groups(n_groups):
+    return pd.DataFrame({
+        "Group Name": [f"Group {g}" for g in range(n_groups)],
+        "Description": [f"Synthetic group {g}" for g in range(n_groups)],
+    })
+
+def make_owners(n_owners=N_OWNERS):
+    return pd.DataFrame({
+        "Name": [f"Owner {i}" for i in range(n_owners)],
+        "Email": [f"owner{i}@example.com" for i in range(n_owners)],
+        "Role": [OWNER_ROLES[i % len(OWNER_ROLES)] for i in range(n_owners)],
+    })
+
+def make_systems(n_systems, n_groups, seed=0):
+    rng = random.Random(seed)
+    groups = [f"Group {g}" for g in range(n_groups)]
+    return pd.DataFrame({
+        "System Name": [f"System {i}" for i in range(n_systems)],
+        "Description": [f"Synthetic system {i}" for i in range(n_systems)],
+        "Group": [rng.choice(groups) for _ in range(n_systems)],
+        "Color": [rng.choice(["#4B4B4B", "#1F77B4", ""]) for _ in range(n_systems)],
+    })
+
+def make_integrations(df_sys, n_edges, seed=0):
+    rng = random.Random(seed)
+    names = list(df_sys["System Name"])
+    # Skewed towards a few hub systems, like a real warehouse/ERP landscape
+    hubs = names[: max(1, len(names) // 20)]
+    rows = []
+    for i in range(n_edges):
+        src = rng.choice(hubs) if rng.random() < 0.3 else rng.choice(names)
+        tgt = rng.choice(hubs) if rng.random() < 0.3 else rng.choice(names)
+        rows.append({
+            "ID": i + 1, "Integration Name": f"Integration {i}", "Description": f"Feed {i}",
+            "Source System": src, "Source Conn": rng.choice(CONNECTION_TYPES),
+            "Target System": tgt, "Target Conn": rng.choice(CONNECTION_TYPES),
+            "Business Owner": f"Owner {rng.randrange(N_OWNERS)}", "IT Owner": f"Owner {rng.randrange(N_OWNERS)}",
+        })
+    return pd.DataFrame(rows)
+
+def make_dataset(n_edges, seed=0):
+    n_systems = max(20, n_edges // 10)
+    df_sys = make_systems(n_systems, max(3, n_systems // 50), seed)
+    return df_sys, make_integrations(df_sys, n_edges, seed)
+
+def make_tables(n_edges, seed=0):
+    # All four tables, referentially consistent (same shape as FILES)
+    df_sys, df_int = make_dataset(n_edges, seed)
+    return {
+        "groups": make_groups(df_sys["Group"].nunique()),
+        "systems": df_sys,
+        "owners": make_owners(),
+        "integrations": df_int,
+    }
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# --- GRAPH CONSTRUCTION: iterrows vs VECTORIZED ---
+# Original row-by-row builder, kept only as the baseline for comparison
+def build_graph_iterrows(df_sys, df_int, selected_group):
+    G = nx.MultiDiGraph()
+    for _, row in df_sys.iterrows():
+        if selected_group and row['Group'] not in selected_group:
+            continue
+        tooltip = f"<b>{row['System Name']}</b><br>Group: {row['Group']}<br>{row['Description']}"
+        raw_color = row['Color']
+        final_color = DEFAULT_COLOR
+        if pd.notna(raw_color) and str(raw_color).strip() != "":
+            final_color = raw_color
+        G.add_node(row['System Name'], label=row['System Name'], title=tooltip, color=final_color,
+                   group=row['Group'], shape="dot", size=25, font={'size': 16, 'color': 'white'})
+    edge_tracker = {}
+    for _, row in df_int.iterrows():
+        if row['Source System'] in G.nodes and row['Target System'] in G.nodes:
+            pair_key = (row['Source System'], row['Target System'])
+            idx = edge_tracker.get(pair_key, 0)
+            edge_tracker[pair_key] = idx + 1
+            direction = 1 if idx % 2 == 0 else -1
+            roundness_val = (0.2 + ((idx // 2) * 0.15)) * direction
+            edge_tooltip = f"""
+            <b>{row['Integration Name']}</b><br>
+            {row['Description']}<br>
+            <hr>
+            Type: {row['Source Conn']} ➔ {row['Target Conn']}<br>
+            Biz Owner: {row['Business Owner']}<br>
+            IT Owner: {row['IT Owner']}
+            """
+            G.add_edge(row['Source System'], row['Target System'], title=edge_tooltip,
+                       label=f"{row['Source Conn']} / {row['Target Conn']}", color={'inherit': 'from'},
+                       font={'size': 10, 'color': 'white', 'strokeWidth': 2, 'strokeColor': '#222222', 'align': 'middle'},
+                       smooth={'type': 'curvedCW', 'roundness': roundness_val},
+                       arrows={'to': {'enabled': True, 'scaleFactor': 1}})
+    return G
+
+def bench_graph_build(n_edges, repeats=3, seed=0):
+    df_sys, df_int = make_dataset(n_edges, seed)
+    selected_group = list(df_sys["Group"].unique()[: max(1, df_sys["Group"].nunique() * 3 // 4)])
+    old = build_graph_iterrows(df_sys, df_int, selected_group)
+    new = build_graph(df_sys, df_int, selected_group)
+    assert list(old.edges(data=True)) == list(new.edges(data=True))
+    old_s = best_of(lambda: build_graph_iterrows(df_sys, df_int, selected_group), repeats)
+    new_s = best_of(lambda: build_graph(df_sys, df_int, selected_group), repeats)
+    print(f"graph build edges={n_edges}: iterrows {old_s * 1000:.1f} ms, vectorized {new_s * 1000:.1f} ms "
+          f"({old_s / new_s:.1f}x)")
+    return [result("graph_build", old_s, edges=n_edges, variant="iterrows"),
+            result("graph_build", new_s, edges=n_edges, variant="vectorized")]
+
+# --- HTML RENDERING: TEMP FILE vs IN MEMORY ---
+def render_via_temp_file(net):
+    path = os.path.join(tempfile.gettempdir(), "network_v13.html")
+    net.save_graph(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def render_in_memory(net):
+    return net.generate_html(notebook=False)
+
+def bench_render(n_edges, repeats=5, seed=0):
+    df_sys, df_int = make_dataset(n_edges, seed)
+    net = build_pyvis_network(df_sys, df_int, "Organic (Neural)", "Full Network", None, [], 650)
+    file_s = best_of(lambda: render_via_temp_file(net), repeats)
+    mem_s = best_of(lambda: render_in_memory(net), repeats)
+    print(f"render edges={n_edges}: temp file {file_s * 1000:.1f} ms, in memory {mem_s * 1000:.1f} ms "
+          f"(saves {(file_s - mem_s) * 1000:.1f} ms per render)")
+    return [result("render", file_s, edges=n_edges, variant="temp_file"),
+            result("render", mem_s, edges=n_edges, variant="in_memory")]
+
+# --- PAYLOAD SIZE: FULL vs COMPACT ---
+# Time-to-interactive needs a real browser; as a server-side proxy this
+# reports generation time plus the time to parse the embedded node/edge
+# JSON, which is what the browser does before vis.js can start drawing.
+def embedded_json_parse_time(html):
+    start = time.perf_counter()
+    for marker in ("nodes = new vis.DataSet(", "edges = new vis.DataSet("):
+        begin = html.index(marker) + len(marker)
+        end = html.index(");\n", begin)
+        json.loads(html[begin:end])
+    if "var edgeTips = " in html:
+        begin = html.index("var edgeTips = ") + len("var edgeTips = ")
+        json.loads(html[begin:html.index(";\n", begin)])
+    return time.perf_counter() - start
+
+def bench_payload(n_edges, repeats=3, seed=0):
+    df_sys, df_int = make_dataset(n_edges, seed)
+    results = []
+    for compact in (False, True):
+        args = (df_sys, df_int, "Hierarchical (Bottom-Up)", "Full Network", None, [], 650)
+        html = generate_network_html(*args, compact=compact)
+        gen_s = best_of(lambda: generate_network_html(*args, compact=compact), repeats)
+        parse_s = embedded_json_parse_time(html)
+        mode = "compact" if compact else "full"
+        print(f"payload edges={n_edges} {mode:7}: {len(html.encode('utf-8')) / 1024:.0f} KiB, "
+              f"generate {gen_s * 1000:.1f} ms, JSON parse {parse_s * 1000:.1f} ms")
+        results.append(result("payload", gen_s, edges=n_edges, variant=mode,
+                              bytes=len(html.encode('utf-8')), parse_ms=round(parse_s * 1000, 3)))
+    return results
+
+# --- END TO END: generate_network_html PER VIEW ---
+def bench_generate_html(n_edges, repeats=3, seed=0):
+    df_sys, df_int = make_dataset(n_edges, seed)
+    focus = df_sys["System Name"].iloc[0]
+    results = []
+    for view_mode in VIEW_MODES:
+        args = (df_sys, df_int, LAYOUT_STYLES[0], view_mode, focus, [], 650)
+        seconds = best_of(lambda: generate_network_html(*args), repeats)
+        print(f"generate_network_html edges={n_edges} view={view_mode}: {seconds * 1000:.1f} ms")
+        results.append(result("generate_network_html", seconds, edges=n_edges, variant=view_mode))
+    return results
+
+# --- INTEGRATIONS SEARCH ---
+SEARCH_QUERIES = ["api", "integration 12", "system 3 database", "owner", "nomatch"]
+
+def bench_search(n_edges, repeats=5, seed=0):
+    df_int = make_dataset(n_edges, seed)[1]
+    build_s = best_of(lambda: SearchIndex.from_frame(df_int), 1)
+    index = SearchIndex.from_frame(df_int)
+    query_s = best_of(lambda: [index.search(query) for query in SEARCH_QUERIES], repeats) / len(SEARCH_QUERIES)
+    print(f"search edges={n_edges}: index build {build_s * 1000:.1f} ms, query {query_s * 1000:.2f} ms")
+    return [result("search", build_s, edges=n_edges, variant="index_build"),
+            result("search", query_s, edges=n_edges, variant="query")]
+
+# --- STORAGE: load_data / save_data ---
+# load_data is a SharedFrames.get: "cold" re-reads the table, "warm" is the
+# version check alone (the common rerun case).
+def bench_storage(n_edges, repeats=3, seed=0):
+    tables = make_tables(n_edges, seed)
+    df_int = tables["integrations"]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "csv": CsvStorage({key: os.path.join(tmp, path) for key, path in FILES.items()}, os.path.join(tmp, "seq.json")),
+            "sqlite": SqliteStorage(os.path.join(tmp, "bench.db")),
+        }
+        for backend, storage in backends.items():
+            for key, df in tables.items():
+                storage.save(key, df)
+            save_s = best_of(lambda: storage.save("integrations", df_int), repeats)
+            cold_s = best_of(lambda: SharedFrames(storage).get("integrations"), repeats)
+            shared = SharedFrames(storage)
+            shared.get("integrations")
+            warm_s = best_of(lambda: shared.get("integrations"), repeats)
+            row_key = df_int["ID"].iloc[len(df_int) // 2]
+            update_s = best_of(lambda: storage.apply_changes("integrations", df_int.iloc[:0], {row_key: {"Description": "edited"}}, []), repeats)
+            print(f"storage {backend} edges={n_edges}: save {save_s * 1000:.1f} ms, load cold {cold_s * 1000:.1f} ms, "
+                  f"warm {warm_s * 1000:.3f} ms, one-row change {update_s * 1000:.1f} ms")
+            results += [result("save_data", save_s, edges=n_edges, variant=backend),
+                        result("load_data", cold_s, edges=n_edges, variant=f"{backend}_cold"),
+                        result("load_data", warm_s, edges=n_edges, variant=f"{backend}_warm"),
+                        result("save_changes", update_s, edges=n_edges, variant=backend)]
+            if backend == "sqlite":
+                storage.connection().close()
+    return results
+
+# --- MACHINE-READABLE RESULTS ---
+def result(benchmark, seconds, **params):
+    return {"benchmark": benchmark, **params, "ms": round(seconds * 1000, 3)}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(results, path, seed):
+    payload = {
+        "tool": "IntegrationApp",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": seed,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
+
+SUITES = {
+    "graph": (bench_graph_build, (1000, 10000, 100000)),
+    "render": (bench_render, (100, 1000, 10000)),
+    "payload": (bench_payload, (1000, 10000)),
+    "html": (bench_generate_html, (100, 1000, 10000)),
+    "search": (bench_search, (1000, 10000, 100000)),
+    "storage": (bench_storage, (1000, 10000, 100000)),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Integration APP benchmarks on seeded synthetic data")
+    parser.add_argument("suites", nargs="*", choices=list(SUITES), help="default: all")
+    parser.add_argument("--sizes", type=int, nargs="+", help="edge counts, overriding each suite's defaults")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data generators")
+    parser.add_argument("--output", help="write JSON results to this path")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.suites or list(SUITES):
+        bench, sizes = SUITES[name]
+        for n_edges in args.sizes or sizes:
+            results += bench(n_edges, seed=args.seed)
+    if args.output:
+        write_results(results, args.output, args.seed)
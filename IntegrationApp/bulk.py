@@ -0,0 +1,157 @@
+import argparse
+import io
+import os
+import sys
+
+import pandas as pd
+
+from storage import COLUMNS, CONNECTION_TYPES, FILES, OWNER_ROLES, storage_from_env
+
+# ==========================================
+# BULK IMPORT / EXPORT
+# ==========================================
+# A batch is validated as a whole against the current tables using set
+# lookups, and only written (in a single insert) when every row passes.
+FORMATS = ["csv", "json", "parquet"]
+
+REQUIRED = {
+    "groups": ["Group Name"],
+    "systems": ["System Name", "Group"],
+    "owners": ["Name", "Role"],
+    "integrations": ["Integration Name", "Source System", "Target System", "Source Conn", "Target Conn"],
+    "report_mappings": ["Entity", "System"]
+}
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported file type '.{extension}' (expected one of: {', '.join(FORMATS)})")
+    return extension
+
+def read_batch(source, fmt):
+    # source: a path or a file-like object (e.g. a Streamlit upload)
+    if fmt == "csv":
+        return pd.read_csv(source)
+    if fmt == "json":
+        return pd.read_json(source, orient="records")
+    if fmt == "parquet":
+        try:
+            return pd.read_parquet(source)
+        except ImportError:
+            raise ImportError("Parquet files require pyarrow (pip install pyarrow)")
+    raise ValueError(f"Unsupported format: {fmt}")
+
+def write_table(df, target, fmt):
+    if fmt == "csv":
+        df.to_csv(target, index=False)
+    elif fmt == "json":
+        df.to_json(target, orient="records", indent=2)
+    elif fmt == "parquet":
+        try:
+            df.to_parquet(target, index=False)
+        except ImportError:
+            raise ImportError("Parquet files require pyarrow (pip install pyarrow)")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+def export_bytes(df, fmt):
+    buffer = io.BytesIO()
+    if fmt == "parquet":
+        write_table(df, buffer, fmt)
+        return buffer.getvalue()
+    text = io.StringIO()
+    write_table(df, text, fmt)
+    return text.getvalue().encode("utf-8")
+
+def blank(value):
+    return pd.isna(value) or str(value).strip() == ""
+
+def validate_batch(key, batch, frames):
+    # frames: current {key: DataFrame}. Returns (rows to insert, errors);
+    # errors name the 1-based data row of the uploaded file.
+    errors = []
+    missing = [col for col in REQUIRED[key] if col not in batch.columns]
+    if missing:
+        return None, [f"Missing required columns: {', '.join(missing)}"]
+    unknown = [col for col in batch.columns if col not in COLUMNS[key]]
+    if unknown:
+        errors.append(f"Ignoring unknown columns: {', '.join(unknown)}")
+    batch = batch.reindex(columns=COLUMNS[key]).reset_index(drop=True)
+
+    groups = set(frames["groups"]["Group Name"])
+    systems = set(frames["systems"]["System Name"])
+    owners = set(frames["owners"]["Name"])
+    unique_column = {"groups": "Group Name", "systems": "System Name", "integrations": "Integration Name",
+                     "report_mappings": "Entity"}.get(key)
+    existing = set(frames[key][unique_column]) if unique_column else set()
+    seen = set()
+
+    problems = []
+    for row_number, row in enumerate(batch.to_dict("records"), start=1):
+        for col in REQUIRED[key]:
+            if blank(row[col]):
+                problems.append(f"Row {row_number}: '{col}' is required")
+        if unique_column and not blank(row[unique_column]):
+            name = row[unique_column]
+            if name in existing:
+                problems.append(f"Row {row_number}: {unique_column} '{name}' already exists")
+            elif name in seen:
+                problems.append(f"Row {row_number}: {unique_column} '{name}' is duplicated in the file")
+            seen.add(name)
+        if key == "systems" and not blank(row["Group"]) and row["Group"] not in groups:
+            problems.append(f"Row {row_number}: Group '{row['Group']}' does not exist")
+        if key == "report_mappings" and not blank(row["System"]) and row["System"] not in systems:
+            problems.append(f"Row {row_number}: System '{row['System']}' is not registered")
+        if key == "owners" and not blank(row["Role"]) and row["Role"] not in OWNER_ROLES:
+            problems.append(f"Row {row_number}: Role must be one of {', '.join(OWNER_ROLES)}")
+        if key == "integrations":
+            for col in ("Source System", "Target System"):
+                if not blank(row[col]) and row[col] not in systems:
+                    problems.append(f"Row {row_number}: {col} '{row[col]}' is not registered")
+            for col in ("Source Conn", "Target Conn"):
+                if not blank(row[col]) and row[col] not in CONNECTION_TYPES:
+                    problems.append(f"Row {row_number}: {col} '{row[col]}' is not a known connection type")
+            for col in ("Business Owner", "IT Owner"):
+                if not blank(row[col]) and row[col] not in owners:
+                    problems.append(f"Row {row_number}: {col} '{row[col]}' is not a registered owner")
+
+    if problems:
+        return None, errors + problems
+    return batch, errors
+
+def assign_ids(batch, ids):
+    batch = batch.copy()
+    batch["ID"] = list(ids)
+    return batch
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export for the Integration APP tables")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("table", choices=list(FILES))
+    parser.add_argument("path", help="CSV, JSON or Parquet file")
+    parser.add_argument("--dry-run", action="store_true", help="validate the batch without writing it")
+    args = parser.parse_args()
+
+    storage = storage_from_env()
+    fmt = detect_format(args.path)
+
+    if args.command == "export":
+        df = storage.load(args.table)
+        write_table(df, args.path, fmt)
+        print(f"Exported {len(df)} rows from '{args.table}' to {args.path}")
+        sys.exit(0)
+
+    frames = {key: storage.load(key) for key in FILES}
+    rows, messages = validate_batch(args.table, read_batch(args.path, fmt), frames)
+    for message in messages:
+        print(message)
+    if rows is None:
+        print("Batch rejected, nothing was written.")
+        sys.exit(1)
+    if args.dry_run:
+        print(f"Dry run: {len(rows)} rows are valid for '{args.table}'")
+    else:
+        if args.table == "integrations":
+            rows = assign_ids(rows, storage.next_ids("integrations", len(rows)))
+        storage.insert(args.table, rows)
+        print(f"Imported {len(rows)} rows into '{args.table}'")
@@ -0,0 +1,100 @@
+import pandas as pd
+
+from storage import REFERENCES, ROW_KEYS
+
+# ==========================================
+# ROW-LEVEL CHANGE SETS
+# ==========================================
+# st.data_editor keeps its deltas in session state under the widget key:
+#   {"edited_rows": {position: {column: value}}, "added_rows": [...], "deleted_rows": [positions]}
+# Positions refer to the frame passed to the editor. The frame the editor
+# returns keeps the original index labels (new rows get fresh ones), so a
+# change set is expressed both as index labels (for the in-memory indexes)
+# and as row keys (for storage).
+class ChangeSet:
+    def __init__(self, key, labels=(), added=None, updated=None, deleted=None, renames=None, addressable=True):
+        self.key = key
+        self.labels = list(labels)
+        self.added = added if added is not None else pd.DataFrame()
+        self.updated = updated or {}
+        self.deleted = list(deleted or [])
+        self.renames = renames or {}
+        # False when a touched row has no usable key (blank or duplicated):
+        # storage then has to rewrite the table instead
+        self.addressable = addressable
+
+    def __bool__(self):
+        return bool(self.labels)
+
+def addressable(df, column, labels):
+    keys = df.loc[labels, column]
+    if keys.isna().any() or keys.duplicated().any():
+        return False
+    return int(df[column].isin(keys).sum()) == len(keys)
+
+def build_change_set(key, before, after, updated_labels, deleted_labels, added_labels, columns_of):
+    # columns_of(label) -> columns whose value changed on that row
+    column = ROW_KEYS[key]
+    dropped = set(deleted_labels)
+    updated_labels = [label for label in updated_labels if label not in dropped]
+    renames = {}
+    for label in updated_labels:
+        old, new = before.at[label, column], after.at[label, column]
+        if column in columns_of(label) and not pd.isna(old) and old != new:
+            renames[old] = new
+
+    touched = updated_labels + list(deleted_labels)
+    is_addressable = addressable(before, column, touched)
+    # A rename onto a key that another updated row still holds (e.g. swapping
+    # two names) cannot be replayed row by row
+    if set(renames.values()) & set(before.loc[updated_labels, column]):
+        is_addressable = False
+
+    updated = {}
+    deleted = []
+    if is_addressable:
+        for label in updated_labels:
+            updated[before.at[label, column]] = {col: after.at[label, col] for col in columns_of(label)}
+        deleted = list(before.loc[list(deleted_labels), column])
+    return ChangeSet(
+        key,
+        labels=touched + list(added_labels),
+        added=after.loc[list(added_labels)],
+        updated=updated,
+        deleted=deleted,
+        renames=renames,
+        addressable=is_addressable
+    )
+
+def editor_changes(key, before, after, editor_state):
+    # before: the frame given to st.data_editor; after: the frame it returned
+    edited = editor_state.get("edited_rows", {})
+    known = [position for position in edited if int(position) < len(before)]
+    updated_labels = [before.index[int(position)] for position in known]
+    columns = {before.index[int(position)]: [col for col in edited[position] if col in after.columns] for position in known}
+    deleted_labels = [before.index[int(position)] for position in editor_state.get("deleted_rows", []) if int(position) < len(before)]
+    added_labels = list(after.index[~after.index.isin(before.index)])
+    return build_change_set(key, before, after, updated_labels, deleted_labels, added_labels, columns.get)
+
+def cascade_renames(change, frames):
+    # One vectorized pass per referencing table: every row holding an old
+    # key in any of the reference columns is rewritten with the new key.
+    # Returns [(change set, before, after)].
+    cascades = []
+    if not change.renames:
+        return cascades
+    old_keys = list(change.renames)
+    for ref_key, columns in REFERENCES.get(change.key, {}).items():
+        before = frames[ref_key]
+        present = [col for col in columns if col in before.columns]
+        if before.empty or not present:
+            continue
+        mask = before[present].isin(old_keys).any(axis=1)
+        if not mask.any():
+            continue
+        after = before.copy()
+        after.loc[mask, present] = before.loc[mask, present].replace(change.renames)
+        changed = before.loc[mask, present].isin(old_keys)
+        changed_columns = {label: [col for col in present if row[col]] for label, row in changed.iterrows()}
+        cascades.append((build_change_set(ref_key, before, after, list(changed_columns), [], [], changed_columns.get), before, after))
+    return cascades
@@ -0,0 +1,45 @@
+import threading
+
+import pandas as pd
+
+# ==========================================
+# HASH INDEXES OVER THE SHARED FRAMES
+# ==========================================
+# value -> row labels for one column. Rebuilt only when the frame object
+# changes (shared frames are replaced, never mutated), so lookups on every
+# rerun are O(1) instead of scanning `.values`.
+class HashIndex:
+    def __init__(self, column):
+        self.column = column
+        self.rows = {}
+        self.source = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, column):
+        index = cls(column)
+        index.sync(df)
+        return index
+
+    def sync(self, df):
+        if df is self.source:
+            return self
+        with self._lock:
+            rows = {}
+            if self.column in df.columns:
+                for label, value in zip(df.index, df[self.column]):
+                    if pd.isna(value):
+                        continue
+                    rows.setdefault(value, []).append(label)
+            self.rows = rows
+            self.source = df
+        return self
+
+    def __contains__(self, value):
+        return value in self.rows
+
+    def get(self, value):
+        return self.rows.get(value, [])
+
+    def duplicates(self):
+        return [value for value, labels in self.rows.items() if len(labels) > 1]
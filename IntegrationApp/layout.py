@@ -0,0 +1,126 @@
+import hashlib
+import json
+import math
+import os
+
+import networkx as nx
+
+# ==========================================
+# SERVER-SIDE STATIC LAYOUT
+# ==========================================
+# Node coordinates are computed once per graph version and cached on disk,
+# so the browser can draw with physics disabled. When the graph changes,
+# the previous layout is reused: existing nodes keep their place and only
+# new nodes are positioned.
+LAYOUT_CACHE_DIR = ".layout_cache"
+LAYOUT_CACHE_MAX_FILES = 50
+SPRING_ITERATIONS = 50
+LAYER_SPACING = 300
+NODE_SPACING = 200
+
+def graph_signature(G):
+    nodes = sorted(map(str, G.nodes))
+    edges = sorted({(str(u), str(v)) for u, v in G.edges()})
+    payload = json.dumps([nodes, edges], separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def pixel_scale(node_count):
+    return max(400, math.sqrt(node_count) * 120)
+
+def layered_positions(G):
+    # Hierarchical layering: collapse cycles, then place each topological
+    # generation on its own row (sources at the bottom, like the DU view).
+    condensed = nx.condensation(G)
+    layer_of = {}
+    for layer, members in enumerate(nx.topological_generations(condensed)):
+        for component in members:
+            for node in condensed.nodes[component]["members"]:
+                layer_of[node] = layer
+    layers = {}
+    for node in G.nodes:
+        layers.setdefault(layer_of.get(node, 0), []).append(node)
+    positions = {}
+    for layer, members in layers.items():
+        members.sort(key=lambda node: (str(G.nodes[node].get("group", "")), str(node)))
+        offset = (len(members) - 1) / 2
+        for i, node in enumerate(members):
+            positions[node] = ((i - offset) * NODE_SPACING, -layer * LAYER_SPACING)
+    return positions
+
+def spring_positions(G, previous):
+    # Works in unit space; previously placed nodes are pinned via `fixed`.
+    undirected = nx.Graph(G)
+    known = {node: previous[node] for node in undirected.nodes if node in previous}
+    if len(known) == len(undirected):
+        raw = known
+    else:
+        raw = nx.spring_layout(
+            undirected,
+            pos=known or None,
+            fixed=list(known) or None,
+            iterations=SPRING_ITERATIONS,
+            seed=42,
+        )
+    return {node: (float(x), float(y)) for node, (x, y) in raw.items()}
+
+def cache_path(cache_dir, name):
+    return os.path.join(cache_dir, name + ".json")
+
+def read_positions(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {node: tuple(xy) for node, xy in json.load(f).items()}
+    except (OSError, ValueError):
+        return None
+
+def write_positions(path, positions):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(positions, f)
+    os.replace(tmp_path, path)
+
+def prune_cache(cache_dir):
+    # Other sessions may prune the same directory at the same time, so any
+    # file can vanish between listing, stat and removal
+    stamped = []
+    for name in os.listdir(cache_dir):
+        if name.endswith("_latest.json"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            stamped.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    if len(stamped) > LAYOUT_CACHE_MAX_FILES:
+        stamped.sort()
+        for _, path in stamped[: len(stamped) - LAYOUT_CACHE_MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def get_positions(G, algorithm="spring", cache_dir=LAYOUT_CACHE_DIR):
+    # Returns {node: (x, y)} in vis.js pixel coordinates.
+    if len(G) == 0:
+        return {}
+    if algorithm == "layered":
+        return layered_positions(G)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(cache_dir, f"{algorithm}_{graph_signature(G)}")
+    raw = read_positions(path)
+    if raw is None:
+        # Cache miss: start from the most recent layout so unchanged nodes stay put
+        previous = read_positions(cache_path(cache_dir, f"{algorithm}_latest")) or {}
+        try:
+            raw = spring_positions(G, previous)
+        except ImportError:
+            # Large graphs need scipy for spring_layout; fall back to layering
+            return layered_positions(G)
+        write_positions(path, raw)
+        # raw covers every node of this graph, pinned ones included, so
+        # removed systems and nodes of other views do not pile up
+        write_positions(cache_path(cache_dir, f"{algorithm}_latest"), raw)
+        prune_cache(cache_dir)
+    scale = pixel_scale(len(G))
+    return {node: (x * scale, y * scale) for node, (x, y) in raw.items() if node in G}
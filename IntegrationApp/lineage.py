@@ -0,0 +1,112 @@
+import threading
+from collections import Counter, deque
+
+# ==========================================
+# LINEAGE INDEX (UPSTREAM / DOWNSTREAM)
+# ==========================================
+# Adjacency sets over data_integrations.csv, built once and kept in sync on
+# save. Parallel integrations between the same pair are counted so that
+# deleting one of them does not drop the edge.
+class LineageIndex:
+    def __init__(self):
+        self.pair_counts = Counter()
+        self.downstream = {}
+        self.upstream = {}
+        self._closures = {}
+        self.source = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_integrations(cls, df_int):
+        index = cls()
+        index.sync(df_int)
+        return index
+
+    @staticmethod
+    def count_pairs(df_int):
+        if df_int.empty:
+            return Counter()
+        pairs = df_int[['Source System', 'Target System']].dropna()
+        return Counter(zip(pairs['Source System'], pairs['Target System']))
+
+    def _link(self, src, tgt):
+        self.downstream.setdefault(src, set()).add(tgt)
+        self.upstream.setdefault(tgt, set()).add(src)
+
+    def _unlink(self, src, tgt):
+        self.downstream[src].discard(tgt)
+        self.upstream[tgt].discard(src)
+
+    def apply_pair_delta(self, delta):
+        # delta: {(src, tgt): +n / -n}; only pairs whose count crosses zero
+        # touch the adjacency sets.
+        with self._lock:
+            for pair, change in delta.items():
+                before = self.pair_counts[pair]
+                after = max(0, before + change)
+                if after:
+                    self.pair_counts[pair] = after
+                else:
+                    self.pair_counts.pop(pair, None)
+                if before == 0 and after > 0:
+                    self._link(*pair)
+                elif before > 0 and after == 0:
+                    self._unlink(*pair)
+            self._closures.clear()
+
+    def sync(self, df_int):
+        # Same frame object as last time: no work (shared frames are replaced
+        # on every change, including reloads after outside writes)
+        if df_int is self.source:
+            return self
+        new_counts = self.count_pairs(df_int)
+        delta = {pair: new_counts[pair] - self.pair_counts.get(pair, 0)
+                 for pair in set(new_counts) | set(self.pair_counts)}
+        self.apply_pair_delta({pair: change for pair, change in delta.items() if change})
+        self.source = df_int
+        return self
+
+    def apply_rows(self, before, after, labels):
+        # Incremental sync when only the rows at these index labels changed.
+        # The delta is only valid against the frame the index last saw; after
+        # a reload of outside writes it falls back to a full sync.
+        if before is not self.source:
+            self.sync(after)
+            return
+        delta = self.count_pairs(after.loc[after.index.intersection(labels)])
+        delta.subtract(self.count_pairs(before.loc[before.index.intersection(labels)]))
+        self.apply_pair_delta({pair: change for pair, change in delta.items() if change})
+        self.source = after
+
+    def reachable(self, node, direction="downstream", depth=None):
+        # Breadth-first walk returning {system: hops}; depth=None is the full
+        # transitive closure. Results are memoized until the next change.
+        key = (node, direction, depth)
+        with self._lock:
+            cached = self._closures.get(key)
+            if cached is not None:
+                return cached
+            adjacency = self.downstream if direction == "downstream" else self.upstream
+            hops = {}
+            queue = deque([(node, 0)])
+            seen = {node}
+            while queue:
+                current, dist = queue.popleft()
+                if depth is not None and dist >= depth:
+                    continue
+                for neighbour in adjacency.get(current, ()):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        hops[neighbour] = dist + 1
+                        queue.append((neighbour, dist + 1))
+            self._closures[key] = hops
+            return hops
+
+    def upstream_of(self, node, depth=None):
+        return self.reachable(node, "upstream", depth)
+
+    def downstream_of(self, node, depth=None):
+        return self.reachable(node, "downstream", depth)
+
+    def lineage_of(self, node, depth=None):
+        return {node} | set(self.upstream_of(node, depth)) | set(self.downstream_of(node, depth))
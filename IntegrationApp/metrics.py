@@ -0,0 +1,71 @@
+import io
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+# ==========================================
+# IN-PROCESS TIMING INSTRUMENTATION
+# ==========================================
+# Every timed span appends one sample (name, start, duration, sizes) to a
+# fixed-size ring buffer shared by all sessions of the server process, so
+# the cost is a perf_counter pair and a deque append per call.
+RING_SIZE = 5000
+EXPORT_FORMATS = ["json", "csv"]
+
+class Recorder:
+    def __init__(self, capacity=RING_SIZE):
+        self.samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def record(self, name, ms, **sizes):
+        with self._lock:
+            self.samples.append({"name": name, "at": time.time(), "ms": ms, **sizes})
+
+    @contextmanager
+    def span(self, name, **sizes):
+        # Yields the sizes dict so callers can add counts known only at the end
+        start = time.perf_counter()
+        try:
+            yield sizes
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, **sizes)
+
+    def frame(self):
+        with self._lock:
+            samples = list(self.samples)
+        return pd.DataFrame(samples, columns=None if samples else ["name", "at", "ms"])
+
+    def summary(self):
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame(columns=["name", "calls", "p50 ms", "p95 ms", "max ms"])
+        grouped = df.groupby("name", sort=True)["ms"]
+        return pd.DataFrame({
+            "calls": grouped.size(),
+            "p50 ms": grouped.quantile(0.5),
+            "p95 ms": grouped.quantile(0.95),
+            "max ms": grouped.max()
+        }).round(2).reset_index()
+
+    def export(self, fmt):
+        df = self.frame()
+        if fmt == "json":
+            return json.dumps(df.to_dict("records"), default=str, indent=2).encode("utf-8")
+        if fmt == "csv":
+            buffer = io.StringIO()
+            df.to_csv(buffer, index=False)
+            return buffer.getvalue().encode("utf-8")
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    def clear(self):
+        with self._lock:
+            self.samples.clear()
+
+RECORDER = Recorder()
+
+def timed(name, **sizes):
+    return RECORDER.span(name, **sizes)
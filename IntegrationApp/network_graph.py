@@ -0,0 +1,413 @@
+import json
+import re
+
+import pandas as pd
+import networkx as nx
+from pyvis.network import Network
+
+from layout import get_positions
+from lineage import LineageIndex
+from metrics import timed
+from report_lineage import REPORT_NODE_PREFIX
+
+DEFAULT_COLOR = "#D3D3D3"
+LAYOUT_STYLES = ["Organic (Neural)", "Hierarchical (Bottom-Up)", "Static (Precomputed)"]
+VIEW_MODES = ["Full Network", "Focus System (Lineage)", "Group Overview (LOD)"]
+GROUP_NODE_PREFIX = "group::"
+
+# ==========================================
+# HELPER: GENERATE NETWORK HTML
+# ==========================================
+# Curvatura em zig-zag para arestas paralelas entre o mesmo par (Origem -> Destino):
+# 1ª linha 0.2, 2ª -0.2, 3ª 0.35, 4ª -0.35 ...
+BASE_CURVE = 0.2
+CURVE_STEP = 0.15 # Passo maior para visibilidade
+
+EDGE_TOOLTIP_PARTS = ("\n            <b>", "</b><br>\n            ", "<br>\n            <hr>\n            Type: ",
+                      " ➔ ", "<br>\n            Biz Owner: ", "<br>\n            IT Owner: ", "\n            ")
+
+# str() por elemento, igual ao f-string original (NaN vira "nan" em qualquer versão do pandas)
+def as_text(series):
+    return series.map(str)
+
+def build_graph(df_sys, df_int, selected_group):
+    G = nx.MultiDiGraph() # Grafo Multi-Direcionado
+    with timed("graph.nodes") as sizes:
+        add_system_nodes(G, df_sys, selected_group)
+        sizes["nodes"] = G.number_of_nodes()
+    with timed("graph.edges") as sizes:
+        add_integration_edges(G, df_int)
+        sizes["edges"] = G.number_of_edges()
+    return G
+
+def add_system_nodes(G, df_sys, selected_group):
+    # 1. Add Nodes (filtro de grupo e tooltips calculados por coluna)
+    systems = df_sys
+    if selected_group:
+        systems = systems[systems['Group'].isin(selected_group)]
+
+    names = systems['System Name']
+    groups = systems['Group']
+    tooltips = "<b>" + as_text(names) + "</b><br>Group: " + as_text(groups) + "<br>" + as_text(systems['Description'])
+    raw_colors = systems['Color']
+    has_color = raw_colors.notna() & (as_text(raw_colors).str.strip() != "")
+    colors = raw_colors.where(has_color, DEFAULT_COLOR)
+
+    G.add_nodes_from(
+        (name, {
+            'label': name, 'title': title, 'color': color, 'group': group,
+            'shape': "dot", 'size': 25,
+            'font': {'size': 16, 'color': 'white'} # Fonte definida no nó
+        })
+        for name, title, color, group in zip(names, tooltips, colors, groups)
+    )
+
+def add_integration_edges(G, df_int):
+    # 2. Add Edges (somente entre nós presentes no grafo)
+    node_names = list(G.nodes)
+    edges = df_int[df_int['Source System'].isin(node_names) & df_int['Target System'].isin(node_names)]
+    if edges.empty:
+        return
+
+    idx = edges.groupby(['Source System', 'Target System'], sort=False, dropna=False).cumcount()
+    direction = (idx % 2 == 0) * 2 - 1
+    roundness = (BASE_CURVE + (idx // 2) * CURVE_STEP) * direction
+
+    src_conn = as_text(edges['Source Conn'])
+    tgt_conn = as_text(edges['Target Conn'])
+    labels = src_conn + " / " + tgt_conn
+    p = EDGE_TOOLTIP_PARTS
+    edge_tooltips = (p[0] + as_text(edges['Integration Name']) + p[1] + as_text(edges['Description']) + p[2]
+                     + src_conn + p[3] + tgt_conn + p[4] + as_text(edges['Business Owner'])
+                     + p[5] + as_text(edges['IT Owner']) + p[6])
+
+    # AQUI: Definimos TUDO sobre a aresta localmente para evitar override global
+    G.add_edges_from(
+        (src, tgt, {
+            'title': title,
+            'label': label,
+            'color': {'inherit': 'from'},
+            'font': {'size': 10, 'color': 'white', 'strokeWidth': 2, 'strokeColor': '#222222', 'align': 'middle'},
+            'smooth': {'type': 'curvedCW', 'roundness': float(r)}, # Força Curvatura Manual
+            'arrows': {'to': {'enabled': True, 'scaleFactor': 1}}
+        })
+        for src, tgt, title, label, r in zip(edges['Source System'], edges['Target System'], edge_tooltips, labels, roundness)
+    )
+
+# pyvis from_nx descarta 'color' de nós com 'group', troca o 'font' de todo
+# nó por font_color e o 'width' de toda aresta pelo peso. O que precisa
+# sobreviver vai em 'style' e é aplicado depois do from_nx.
+def apply_styles(net):
+    for item in net.nodes + net.edges:
+        style = item.pop('style', None)
+        if style:
+            item.update(style)
+
+# ==========================================
+# LEVEL OF DETAIL: GROUP SUPER-NODES
+# ==========================================
+# Resumo pré-calculado por par de sistemas e tipo de conexão. A visão por
+# grupos só agrega este resumo, então o número de elementos desenhados
+# depende dos grupos (e dos grupos expandidos), não do total de integrações.
+def summarize_integrations(df_sys, df_int):
+    columns = ['Source System', 'Target System', 'Source Conn', 'Target Conn']
+    summary = df_int.groupby(columns, dropna=False).size().reset_index(name='Count')
+    group_of = dict(zip(df_sys['System Name'], df_sys['Group']))
+    summary['Source Group'] = summary['Source System'].map(group_of)
+    summary['Target Group'] = summary['Target System'].map(group_of)
+    return summary.dropna(subset=['Source Group', 'Target Group'])
+
+def build_group_graph(df_sys, summary, expanded_groups, selected_group):
+    G = nx.MultiDiGraph()
+    systems = df_sys
+    if selected_group:
+        systems = systems[systems['Group'].isin(selected_group)]
+        summary = summary[summary['Source Group'].isin(selected_group) & summary['Target Group'].isin(selected_group)]
+    expanded = set(expanded_groups or [])
+
+    internal = summary[summary['Source Group'] == summary['Target Group']].groupby('Source Group')['Count'].sum()
+    for group, members in systems.groupby('Group', sort=True):
+        if group in expanded:
+            # Drawn like in the full view (pyvis colors them by group)
+            for name, desc in zip(members['System Name'], members['Description']):
+                G.add_node(name, label=name, title=f"<b>{name}</b><br>Group: {group}<br>{desc}",
+                           group=group, shape="dot", size=25)
+        else:
+            colors = members['Color'].dropna()
+            colors = colors[colors.astype(str).str.strip() != ""]
+            G.add_node(
+                GROUP_NODE_PREFIX + str(group),
+                label=f"{group}\n({len(members)} systems)",
+                title=f"<b>{group}</b><br>{len(members)} systems<br>{int(internal.get(group, 0))} internal integrations",
+                group=group, shape="dot", size=min(80, 25 + 5 * len(members) ** 0.5),
+                style={'color': colors.mode().iloc[0] if not colors.empty else DEFAULT_COLOR,
+                       'font': {'size': 18, 'color': 'white'}}
+            )
+
+    # Extremidade = sistema (grupo expandido) ou super-nó do grupo
+    def endpoint(system, group):
+        return system if group in expanded else GROUP_NODE_PREFIX + str(group)
+
+    src = [endpoint(sy, gr) for sy, gr in zip(summary['Source System'], summary['Source Group'])]
+    tgt = [endpoint(sy, gr) for sy, gr in zip(summary['Target System'], summary['Target Group'])]
+    edges = pd.DataFrame({
+        'src': src, 'tgt': tgt, 'Count': summary['Count'].to_numpy(),
+        'conn': (as_text(summary['Source Conn']) + " ➔ " + as_text(summary['Target Conn'])).to_numpy()
+    })
+    edges = edges[(edges['src'] != edges['tgt']) & edges['src'].isin(list(G.nodes)) & edges['tgt'].isin(list(G.nodes))]
+
+    by_type = edges.groupby(['src', 'tgt', 'conn'], sort=False)['Count'].sum().reset_index()
+    by_type = by_type.sort_values(['src', 'tgt', 'Count'], ascending=[True, True, False])
+    by_type['line'] = by_type['conn'] + ": " + as_text(by_type['Count'])
+    pairs = by_type.groupby(['src', 'tgt'], sort=False).agg(total=('Count', 'sum'), breakdown=('line', "<br>".join))
+
+    G.add_edges_from(
+        (u, v, {
+            'title': f"<b>{int(total)} integrations</b><br>{breakdown}",
+            'label': str(int(total)),
+            'style': {'width': 1 + min(int(total), 64) ** 0.5},
+            'color': {'inherit': 'from'},
+            'font': {'size': 12, 'color': 'white', 'strokeWidth': 2, 'strokeColor': '#222222', 'align': 'middle'},
+            'smooth': {'type': 'curvedCW', 'roundness': BASE_CURVE},
+            'arrows': {'to': {'enabled': True, 'scaleFactor': 1}}
+        })
+        for (u, v), total, breakdown in zip(pairs.index, pairs['total'], pairs['breakdown'])
+    )
+    return G
+
+# ==========================================
+# REPORT LAYER (POWER BI)
+# ==========================================
+# Relatórios entram como nós "box" ligados aos sistemas dos quais leem
+# tabelas (arestas tracejadas sistema -> relatório). Na visão por grupos, um
+# sistema recolhido é representado pelo super-nó do seu grupo.
+REPORT_COLOR = "#F2C94C"
+
+def add_report_layer(G, reports, df_sys):
+    node_of = {}
+    group_of = dict(zip(df_sys['System Name'], df_sys['Group']))
+    for system in reports.edges['System'].unique():
+        if system in G:
+            node_of[system] = system
+        elif GROUP_NODE_PREFIX + str(group_of.get(system)) in G:
+            node_of[system] = GROUP_NODE_PREFIX + str(group_of[system])
+    edges = reports.edges.assign(node=reports.edges['System'].map(node_of)).dropna(subset=['node'])
+    if edges.empty:
+        return
+    edges = edges.groupby(['node', 'Report'], sort=False)['Tables'].agg(lambda lists: sorted(set().union(*lists))).reset_index()
+    tables_per_report = edges.groupby('Report', sort=False)['Tables'].agg(lambda lists: len(set().union(*lists)))
+
+    G.add_nodes_from(
+        (REPORT_NODE_PREFIX + str(report), {
+            'label': str(report), 'title': f"<b>{report}</b><br>Power BI report<br>{count} mapped tables",
+            'group': "Reports", 'shape': "box", 'size': 25,
+            'style': {'color': REPORT_COLOR, 'font': {'size': 14, 'color': '#222222'}}
+        })
+        for report, count in tables_per_report.items()
+    )
+    G.add_edges_from(
+        (node, REPORT_NODE_PREFIX + str(report), {
+            'title': "<b>Tables used</b><br>" + "<br>".join(map(str, tables)),
+            'label': f"{len(tables)} tables",
+            'dashes': True,
+            'color': {'inherit': 'from'},
+            'font': {'size': 10, 'color': 'white', 'strokeWidth': 2, 'strokeColor': '#222222', 'align': 'middle'},
+            'smooth': {'type': 'curvedCW', 'roundness': BASE_CURVE},
+            'arrows': {'to': {'enabled': True, 'scaleFactor': 1}}
+        })
+        for node, report, tables in zip(edges['node'], edges['Report'], edges['Tables'])
+    )
+
+# ==========================================
+# COMPACT PAYLOAD
+# ==========================================
+# Estilo comum vai uma vez nas opções globais; cada nó/aresta leva só o que
+# muda (id, label, cor, roundness). Tooltips de arestas ficam numa lista à
+# parte e só entram no DataSet quando o mouse passa pela aresta.
+# pyvis replaces every node's font with {"color": font_color}, so that (at
+# the default size) is what full mode renders and what compact mode hoists
+COMPACT_OPTIONS = {
+    "nodes": {"shape": "dot", "size": 25, "font": {"color": "white"}},
+    "edges": {
+        "color": {"inherit": "from"},
+        "font": {"size": 10, "color": "white", "strokeWidth": 2, "strokeColor": "#222222", "align": "middle"},
+        "smooth": {"enabled": True, "type": "curvedCW"},
+        "arrows": {"to": {"enabled": True, "scaleFactor": 1}}
+    },
+    "interaction": {"hover": True}
+}
+NODE_STYLE_KEYS = ("shape", "size", "font")
+EDGE_STYLE_KEYS = ("color", "font", "arrows")
+TOOLTIP_WHITESPACE = re.compile(r"\s*\n\s*")
+
+LAZY_TOOLTIP_SCRIPT = """
+        <script type="text/javascript">
+              var edgeTips = %s;
+              network.on("hoverEdge", function (params) {
+                  var tip = edgeTips[params.edge];
+                  if (tip !== null && tip !== undefined) {
+                      edges.update({id: params.edge, title: tip});
+                      edgeTips[params.edge] = null;
+                  }
+              });
+        </script>
+    </body>"""
+
+# Só remove o que é igual ao padrão global (nós de grupo/relatório mantêm o seu estilo)
+def compact_network(net):
+    for node in net.nodes:
+        for key in NODE_STYLE_KEYS:
+            if node.get(key) == COMPACT_OPTIONS["nodes"][key]:
+                del node[key]
+    tips = []
+    for edge_id, edge in enumerate(net.edges):
+        for key in EDGE_STYLE_KEYS:
+            if edge.get(key) == COMPACT_OPTIONS["edges"][key]:
+                del edge[key]
+        if edge.get("width") == 1:
+            del edge["width"]
+        smooth = edge.get("smooth")
+        if isinstance(smooth, dict) and "roundness" in smooth:
+            edge["smooth"] = {"roundness": smooth["roundness"]}
+        edge["id"] = edge_id
+        title = edge.pop("title", None)
+        tips.append(TOOLTIP_WHITESPACE.sub(" ", title).strip() if title else None)
+
+    for section, values in COMPACT_OPTIONS.items():
+        net.options.setdefault(section, {}).update(values)
+    return tips
+
+def inject_lazy_tooltips(html, tips):
+    script = LAZY_TOOLTIP_SCRIPT % json.dumps(tips, ensure_ascii=False, separators=(",", ":"))
+    head, sep, tail = html.rpartition("</body>")
+    if not sep:
+        return html
+    return head + script + tail
+
+def build_pyvis_network(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px, lineage_depth=1, lineage=None, expanded_groups=None, summary=None, compact=False, reports=None):
+    
+    if view_mode == "Group Overview (LOD)":
+        if summary is None:
+            summary = summarize_integrations(df_sys, df_int)
+        with timed("graph.groups") as sizes:
+            G = build_group_graph(df_sys, summary, expanded_groups, selected_group)
+            sizes.update(nodes=G.number_of_nodes(), edges=G.number_of_edges())
+    else:
+        G = build_graph(df_sys, df_int, selected_group)
+
+    # reports: ReportLineage com a junção relatório -> tabela -> sistema já pronta
+    if reports:
+        with timed("graph.reports") as sizes:
+            add_report_layer(G, reports, df_sys)
+            sizes["nodes"] = G.number_of_nodes()
+
+    # Posições calculadas no servidor (cache em disco por versão do grafo),
+    # antes do foco para que o subgrafo mantenha as mesmas coordenadas
+    if layout_style == "Static (Precomputed)":
+        with timed("graph.layout", nodes=G.number_of_nodes()):
+            for node, (x, y) in get_positions(G).items():
+                G.nodes[node]['x'] = x
+                G.nodes[node]['y'] = y
+
+    # 3. Focus Logic (lineage_depth hops up/downstream, None = cadeia completa)
+    if view_mode == "Focus System (Lineage)" and focus_node:
+        if focus_node in G:
+            with timed("graph.focus") as sizes:
+                if lineage is None:
+                    lineage = LineageIndex.from_integrations(df_int)
+                nodes_to_keep = lineage.lineage_of(focus_node, lineage_depth)
+                if reports:
+                    nodes_to_keep |= {REPORT_NODE_PREFIX + str(report) for report in reports.reports_of(nodes_to_keep)}
+                nodes_to_keep &= set(G.nodes)
+                G = G.subgraph(list(nodes_to_keep))
+                sizes.update(nodes=G.number_of_nodes(), edges=G.number_of_edges())
+
+    # 4. Generate PyVis
+    if len(G.nodes) > 0:
+        net = Network(height=f'{height_px}px', width='100%', bgcolor='#222222', font_color='white', directed=True)
+        with timed("graph.pyvis", nodes=G.number_of_nodes(), edges=G.number_of_edges()):
+            net.from_nx(G)
+            apply_styles(net)
+        
+        # --- OPTIONS LOGIC (SEM BLOCO DE EDGES GLOBAL) ---
+        # Removemos a configuração global de 'edges' e 'smooth' para respeitar a configuração individual acima.
+        
+        if layout_style == "Hierarchical (Bottom-Up)":
+            options_script = """
+            var options = {
+              "layout": {
+                "hierarchical": {
+                  "enabled": true,
+                  "direction": "DU",
+                  "sortMethod": "directed",
+                  "nodeSpacing": 350,
+                  "levelSeparation": 300,
+                  "blockShifting": true,
+                  "edgeMinimization": false
+                }
+              },
+              "physics": {
+                "enabled": false
+              },
+              "nodes": { 
+                "borderWidth": 2, 
+                "shadow": true
+              }
+            }
+            """
+        elif layout_style == "Static (Precomputed)":
+            options_script = """
+            var options = {
+              "physics": {
+                "enabled": false
+              },
+              "nodes": { 
+                "borderWidth": 2, 
+                "shadow": true
+              }
+            }
+            """
+        else:
+            # Organic
+            options_script = """
+            var options = {
+              "nodes": { 
+                "borderWidth": 2,
+                "shadow": true
+              },
+              "physics": { 
+                "barnesHut": { 
+                    "gravitationalConstant": -3000, 
+                    "centralGravity": 0.3, 
+                    "springLength": 300, 
+                    "springConstant": 0.001, 
+                    "damping": 0.5,
+                    "avoidOverlap": 0.2
+                }, 
+                "minVelocity": 0.75 
+              }
+            }
+            """
+
+        net.set_options(options_script)
+        net.lazy_tooltips = compact_network(net) if compact else None
+        return net
+    else:
+        return None
+
+def generate_network_html(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px, lineage_depth=1, lineage=None, expanded_groups=None, summary=None, compact=False, reports=None):
+    with timed("generate_network_html", view=view_mode, systems=len(df_sys), integrations=len(df_int)) as sizes:
+        net = build_pyvis_network(df_sys, df_int, layout_style, view_mode, focus_node, selected_group, height_px, lineage_depth, lineage, expanded_groups, summary, compact, reports)
+        if net is None:
+            return None
+        # Render straight to a string: no shared temp file, so concurrent
+        # sessions cannot overwrite each other's output.
+        with timed("graph.serialize") as serialize_sizes:
+            try:
+                html = net.generate_html(notebook=False)
+            except Exception as e: 
+                return f"Error: {e}"
+            if net.lazy_tooltips is not None:
+                html = inject_lazy_tooltips(html, net.lazy_tooltips)
+            serialize_sizes["bytes"] = sizes["bytes"] = len(html)
+        return html
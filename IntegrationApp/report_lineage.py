@@ -0,0 +1,123 @@
+import json
+import os
+import sys
+import threading
+
+import pandas as pd
+
+# ==========================================
+# REPORT LINEAGE (REPORTTRACING -> SYSTEMS)
+# ==========================================
+# ReportTracing writes one (root, folder, node, value) row per Entity /
+# Property / queryRef a Power BI report uses; value is JSON-encoded. The
+# Entity rows give report -> table usage, and the report_mappings table
+# maps each table to the system hosting it. The joined
+# report -> table -> system edges are rebuilt only when the scan output or
+# the mapping frame changes, never per render.
+DEFAULT_REPORT_METADATA = os.path.join("..", "ReportTracing", "extracted_metadata.csv")
+DEFAULT_REPORTS_FOLDER = os.path.join("..", "ReportTracing", "reports")
+REPORT_TRACING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ReportTracing")
+REPORT_NODE_PREFIX = "report::"
+EDGE_COLUMNS = ["System", "Report", "Tables"]
+
+def decode_value(value):
+    try:
+        decoded = json.loads(value)
+    except (TypeError, ValueError):
+        return value
+    return decoded if isinstance(decoded, str) else None
+
+def load_scan_service():
+    # ReportTracing is a sibling folder, not an installed package; appended
+    # (not prepended) so its benchmark.py never shadows this app's modules
+    if REPORT_TRACING_DIR not in sys.path:
+        sys.path.append(REPORT_TRACING_DIR)
+    try:
+        import scan_service
+    except ImportError:
+        return None
+    return scan_service
+
+def read_metadata(path):
+    # Any of the ReportTracing outputs: .csv, .csv.gz or .parquet
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path, columns=["root", "node", "value"])
+    return pd.read_csv(path, usecols=["root", "node", "value"])
+
+def table_usage(metadata):
+    entities = metadata[metadata["node"] == "Entity"]
+    usage = pd.DataFrame({"Report": entities["root"], "Entity": entities["value"].map(decode_value)})
+    return usage.dropna().drop_duplicates().reset_index(drop=True)
+
+class ReportLineage:
+    def __init__(self, metadata_path=DEFAULT_REPORT_METADATA):
+        self.metadata_path = metadata_path
+        self.usage = pd.DataFrame(columns=["Report", "Entity"])
+        self.edges = pd.DataFrame(columns=EDGE_COLUMNS)
+        self.system_reports = {}
+        self.report_systems = {}
+        self.error = None
+        self._usage_version = None
+        self._mapping = None
+        self._joins = 0
+        self._lock = threading.Lock()
+
+    def metadata_version(self):
+        try:
+            stat = os.stat(self.metadata_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @property
+    def version(self):
+        # Hashable stamp for render caches: changes whenever the join does
+        return (self._usage_version, self._joins)
+
+    def sync(self, mapping):
+        # Re-reads the scan output only after a new scan, and re-joins only
+        # when either side changed (mapping frames are replaced, not mutated)
+        version = self.metadata_version()
+        if version == self._usage_version and mapping is self._mapping:
+            return self
+        with self._lock:
+            if version != self._usage_version:
+                self.error = None
+                try:
+                    self.usage = table_usage(read_metadata(self.metadata_path)) if version else self.usage.iloc[0:0]
+                except (OSError, ValueError, ImportError) as e:
+                    self.error = str(e)
+                    self.usage = self.usage.iloc[0:0]
+                self._usage_version = version
+            self._join(mapping)
+            self._mapping = mapping
+        return self
+
+    def _join(self, mapping):
+        self._joins += 1
+        joined = self.usage.merge(mapping[["Entity", "System"]].dropna(), on="Entity", how="inner")
+        if joined.empty:
+            self.edges = pd.DataFrame(columns=EDGE_COLUMNS)
+            self.system_reports, self.report_systems = {}, {}
+            return
+        joined = joined.sort_values(["System", "Report", "Entity"])
+        self.edges = (joined.groupby(["System", "Report"], sort=False)["Entity"]
+                      .agg(list).reset_index().rename(columns={"Entity": "Tables"}))
+        self.system_reports = {system: set(reports) for system, reports in self.edges.groupby("System")["Report"]}
+        self.report_systems = {report: set(systems) for report, systems in self.edges.groupby("Report")["System"]}
+
+    def __bool__(self):
+        return not self.edges.empty
+
+    def unmapped_entities(self, mapping):
+        return sorted(set(self.usage["Entity"]) - set(mapping["Entity"].dropna()))
+
+    def reports_of(self, systems):
+        # Reports reading from any of the given systems
+        found = set()
+        for system in systems:
+            found |= self.system_reports.get(system, set())
+        return found
+
+    def systems_of(self, report):
+        return self.report_systems.get(report, set())
@@ -0,0 +1,148 @@
+import re
+import threading
+from bisect import bisect_left
+
+import pandas as pd
+
+# ==========================================
+# INVERTED INDEX FOR INTEGRATION SEARCH
+# ==========================================
+# Field weights drive the ranking: a hit on the integration name counts
+# more than a hit on an owner or in the free-text description.
+SEARCH_FIELDS = {
+    "Integration Name": 4,
+    "Source System": 3,
+    "Target System": 3,
+    "Source Conn": 2,
+    "Target Conn": 2,
+    "Business Owner": 2,
+    "IT Owner": 2,
+    "Description": 1
+}
+EXACT_BONUS = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text):
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+class SearchIndex:
+    # Postings map token -> {row label: weight}. Queries are split into
+    # terms; each term matches tokens exactly or by prefix, and a row must
+    # match every term (AND). Query text is never used as a regex.
+    def __init__(self):
+        self.postings = {}
+        self.row_tokens = {}
+        self.row_values = {}
+        self.order = {}
+        self.source = None
+        self._sorted_tokens = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df):
+        index = cls()
+        index.sync(df)
+        return index
+
+    def _row_weights(self, values):
+        weights = {}
+        for field_weight, value in zip(SEARCH_FIELDS.values(), values):
+            for token in tokenize(value):
+                if weights.get(token, 0) < field_weight:
+                    weights[token] = field_weight
+        return weights
+
+    def _remove_row(self, label):
+        for token in self.row_tokens.pop(label, {}):
+            rows = self.postings.get(token)
+            if rows is not None:
+                rows.pop(label, None)
+                if not rows:
+                    del self.postings[token]
+                    self._sorted_tokens = None
+        self.row_values.pop(label, None)
+
+    def _add_row(self, label, values):
+        weights = self._row_weights(values)
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                self._sorted_tokens = None
+            self.postings[token][label] = weight
+        self.row_tokens[label] = weights
+        self.row_values[label] = values
+
+    def sync(self, df):
+        # Re-tokenizes only rows whose searchable values changed, keyed by
+        # the frame's index label. Same frame object as last time: no work.
+        if df is self.source:
+            return
+        with self._lock:
+            current = {}
+            frame = df.reindex(columns=list(SEARCH_FIELDS))
+            for position, (label, *values) in enumerate(frame.itertuples(name=None)):
+                values = tuple(values)
+                current[label] = position
+                if self.row_values.get(label) != values:
+                    self._remove_row(label)
+                    self._add_row(label, values)
+            for label in [label for label in self.row_values if label not in current]:
+                self._remove_row(label)
+            self.order = current
+            self.source = df
+
+    def update_rows(self, before, df, labels):
+        # Like sync, but only re-indexes the given row labels (from a change
+        # set); falls back to sync when the index did not last see `before`
+        if before is not self.source:
+            self.sync(df)
+            return
+        with self._lock:
+            present = df.index.intersection(labels)
+            frame = df.loc[present].reindex(columns=list(SEARCH_FIELDS))
+            for label in labels:
+                self._remove_row(label)
+            for label, *values in frame.itertuples(name=None):
+                self._add_row(label, tuple(values))
+            self.order = {label: position for position, label in enumerate(df.index)}
+            self.source = df
+
+    def _tokens_with_prefix(self, prefix):
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self.postings)
+        tokens = self._sorted_tokens
+        start = bisect_left(tokens, prefix)
+        end = start
+        while end < len(tokens) and tokens[end].startswith(prefix):
+            end += 1
+        return tokens[start:end]
+
+    def search(self, query, limit=None):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            per_term = []
+            for term in terms:
+                term_scores = {}
+                for token in self._tokens_with_prefix(term):
+                    bonus = EXACT_BONUS if token == term else 1
+                    for label, weight in self.postings[token].items():
+                        score = weight * bonus
+                        if term_scores.get(label, 0) < score:
+                            term_scores[label] = score
+                if not term_scores:
+                    return []
+                per_term.append(term_scores)
+            # Intersect starting from the most selective term
+            per_term.sort(key=len)
+            scores = per_term[0]
+            for term_scores in per_term[1:]:
+                scores = {label: score + term_scores[label] for label, score in scores.items() if label in term_scores}
+                if not scores:
+                    return []
+            ranked = sorted(scores, key=lambda label: (-scores[label], self.order.get(label, 0)))
+        return ranked[:limit] if limit else ranked
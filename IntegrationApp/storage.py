@@ -0,0 +1,409 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# STORAGE BACKENDS (CSV / SQLITE)
+# ==========================================
+FILES = {
+    "groups": "data_groups.csv",
+    "systems": "data_systems.csv",
+    "owners": "data_owners.csv",
+    "integrations": "data_integrations.csv",
+    "report_mappings": "data_report_mappings.csv"
+}
+
+COLUMNS = {
+    "groups": ["Group Name", "Description"],
+    "systems": ["System Name", "Description", "Group", "Color"],
+    "owners": ["Name", "Email", "Role"],
+    "integrations": ["ID", "Integration Name", "Description", "Source System", "Source Conn", "Target System", "Target Conn", "Business Owner", "IT Owner"],
+    # Power BI table (ReportTracing "Entity") -> system that hosts it
+    "report_mappings": ["Entity", "System"]
+}
+
+# Column used to address a single row for updates and deletes
+ROW_KEYS = {
+    "groups": "Group Name",
+    "systems": "System Name",
+    "owners": "Name",
+    "integrations": "ID",
+    "report_mappings": "Entity"
+}
+
+# Columns in other tables that hold a row key of this table; renaming the
+# key cascades to them
+REFERENCES = {
+    "groups": {"systems": ["Group"]},
+    "systems": {"integrations": ["Source System", "Target System"], "report_mappings": ["System"]},
+    "owners": {"integrations": ["Business Owner", "IT Owner"]}
+}
+
+INDEXES = {
+    "groups": [["Group Name"]],
+    "systems": [["System Name"], ["Group"]],
+    "owners": [["Name"]],
+    "integrations": [["Integration Name"], ["Source System"], ["Target System"], ["Source System", "Target System"]],
+    "report_mappings": [["Entity"], ["System"]]
+}
+
+CONNECTION_TYPES = [
+    "API", "Database", "Lakehouse", "Report", 
+    "Event Streams", "CSV File", "Manual Integration", "Web Services"
+]
+OWNER_ROLES = ["Business Owner", "IT Owner"]
+
+DEFAULT_DB_PATH = "integration_app.db"
+SEQUENCE_FILE = "data_sequences.json"
+LOCK_TIMEOUT = 10
+
+def empty_frame(key):
+    return pd.DataFrame(columns=COLUMNS[key])
+
+def normalize_frame(key, df):
+    if key == "integrations" and "Description" not in df.columns:
+        df["Description"] = ""
+    return df
+
+def to_sql_value(value):
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+def set_values(df, label, values):
+    # .at refuses text in an all-empty (float) column; widen the column first
+    for column, value in values.items():
+        try:
+            df.at[label, column] = value
+        except (TypeError, ValueError):
+            df[column] = df[column].astype(object)
+            df.at[label, column] = value
+
+def max_id(df):
+    if df.empty or "ID" not in df.columns:
+        return 0
+    ids = pd.to_numeric(df["ID"], errors="coerce")
+    return int(ids.max()) if ids.notna().any() else 0
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+@contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    # Cross-process mutex (app servers, the bulk CLI): whoever creates the
+    # lock file first owns it. A lock older than the timeout was left behind
+    # by a crashed process and is broken.
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                stale = time.time() - os.path.getmtime(path) > timeout
+            except OSError:
+                continue
+            if stale:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for {path}")
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class CsvStorage:
+    # Original behaviour: one CSV per table, rewritten as a whole on save.
+    # Inserts are appended to the end of the file instead of rewriting it.
+    def __init__(self, files=FILES, sequence_file=SEQUENCE_FILE):
+        self.files = files
+        self.sequence_file = sequence_file
+        self._sequence_lock = threading.Lock()
+
+    def next_ids(self, key, count=1):
+        # Monotonic sequence persisted next to the CSVs: IDs of deleted rows
+        # are never handed out again. Seeded from the table's current max.
+        # The thread lock serializes sessions; the lock file other processes.
+        with self._sequence_lock, file_lock(self.sequence_file + ".lock"):
+            try:
+                with open(self.sequence_file, 'r', encoding='utf-8') as f:
+                    sequences = json.load(f)
+            except (OSError, ValueError):
+                sequences = {}
+            last = int(sequences[key]) if key in sequences else max_id(self.load(key))
+            sequences[key] = last + count
+            tmp_path = self.sequence_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(sequences, f)
+            os.replace(tmp_path, self.sequence_file)
+        return list(range(last + 1, last + count + 1))
+
+    def version(self, key):
+        # Cheap change detector: a stat call instead of re-reading the file
+        try:
+            stat = os.stat(self.files[key])
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self, key):
+        if not os.path.exists(self.files[key]):
+            return empty_frame(key)
+        return normalize_frame(key, pd.read_csv(self.files[key]))
+
+    def save(self, key, df):
+        path = self.files[key]
+        tmp_path = path + ".tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def insert(self, key, rows):
+        path = self.files[key]
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self.save(key, rows)
+            return
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), list(rows.columns))
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            if needs_newline:
+                f.write("\n")
+            rows.reindex(columns=header).to_csv(f, index=False, header=False)
+
+    def update(self, key, row_key, values):
+        df = self.load(key)
+        mask = df[ROW_KEYS[key]] == row_key
+        for column, value in values.items():
+            df.loc[mask, column] = value
+        self.save(key, df)
+
+    def delete(self, key, row_keys):
+        df = self.load(key)
+        self.save(key, df[~df[ROW_KEYS[key]].isin(list(row_keys))])
+
+    def apply_changes(self, key, added, updated, deleted):
+        # Additions alone are appended; updates/deletes cost one rewrite
+        if not updated and not deleted:
+            if not added.empty:
+                self.insert(key, added)
+            return
+        df = self.load(key)
+        column = ROW_KEYS[key]
+        labels = dict(zip(df[column], df.index))
+        for row_key, values in updated.items():
+            if row_key in labels:
+                set_values(df, labels[row_key], values)
+        df = df[~df.index.isin([labels[k] for k in deleted if k in labels])]
+        if not added.empty:
+            df = pd.concat([df, added.reindex(columns=df.columns)], ignore_index=True)
+        self.save(key, df)
+
+class SqliteStorage:
+    # One table per FILES key. WAL lets readers keep going while a writer
+    # commits; every write runs in its own transaction.
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.create_schema()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create_schema(self):
+        conn = self.connection()
+        with conn:
+            for key, columns in COLUMNS.items():
+                column_defs = ", ".join(
+                    f"{quote(col)} INTEGER" if col == "ID" else f"{quote(col)} TEXT" for col in columns
+                )
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {quote(key)} ({column_defs})")
+                for index_columns in INDEXES.get(key, []):
+                    index_name = "idx_" + key + "_" + "_".join(col.lower().replace(" ", "_") for col in index_columns)
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(index_name)} ON {quote(key)} "
+                                 f"({', '.join(quote(col) for col in index_columns)})")
+            conn.execute("CREATE TABLE IF NOT EXISTS table_versions (key TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS sequences (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def next_ids(self, key, count=1):
+        # BEGIN IMMEDIATE takes the write lock up front, so two sessions (or
+        # processes) can never be handed the same range.
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM sequences WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                row = conn.execute(f"SELECT COALESCE(MAX({quote('ID')}), 0) FROM {quote(key)}").fetchone()
+            last = int(row[0])
+            conn.execute("INSERT INTO sequences (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, last + count))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return list(range(last + 1, last + count + 1))
+
+    def bump_version(self, conn, key):
+        conn.execute("INSERT INTO table_versions (key, version) VALUES (?, 1) "
+                     "ON CONFLICT(key) DO UPDATE SET version = version + 1", (key,))
+
+    def version(self, key):
+        row = self.connection().execute("SELECT version FROM table_versions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, key):
+        columns = COLUMNS[key]
+        cursor = self.connection().execute(
+            f"SELECT {', '.join(quote(col) for col in columns)} FROM {quote(key)} ORDER BY rowid"
+        )
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        return df.replace({None: np.nan})
+
+    def _insert_sql(self, key, columns):
+        placeholders = ", ".join("?" for _ in columns)
+        return f"INSERT INTO {quote(key)} ({', '.join(quote(col) for col in columns)}) VALUES ({placeholders})"
+
+    def _rows(self, key, df):
+        columns = [col for col in COLUMNS[key] if col in df.columns]
+        values = ([to_sql_value(v) for v in row] for row in df[columns].itertuples(index=False, name=None))
+        return columns, values
+
+    def save(self, key, df):
+        conn = self.connection()
+        columns, values = self._rows(key, df)
+        with conn:
+            conn.execute(f"DELETE FROM {quote(key)}")
+            conn.executemany(self._insert_sql(key, columns), values)
+            self.bump_version(conn, key)
+
+    def insert(self, key, rows):
+        conn = self.connection()
+        columns, values = self._rows(key, rows)
+        with conn:
+            conn.executemany(self._insert_sql(key, columns), values)
+            self.bump_version(conn, key)
+
+    def _update(self, conn, key, row_key, values):
+        assignments = ", ".join(f"{quote(col)} = ?" for col in values)
+        params = [to_sql_value(v) for v in values.values()] + [to_sql_value(row_key)]
+        conn.execute(f"UPDATE {quote(key)} SET {assignments} WHERE {quote(ROW_KEYS[key])} = ?", params)
+
+    def _delete(self, conn, key, row_keys):
+        conn.executemany(f"DELETE FROM {quote(key)} WHERE {quote(ROW_KEYS[key])} = ?",
+                         [(to_sql_value(k),) for k in row_keys])
+
+    def update(self, key, row_key, values):
+        conn = self.connection()
+        with conn:
+            self._update(conn, key, row_key, values)
+            self.bump_version(conn, key)
+
+    def delete(self, key, row_keys):
+        conn = self.connection()
+        with conn:
+            self._delete(conn, key, row_keys)
+            self.bump_version(conn, key)
+
+    def apply_changes(self, key, added, updated, deleted):
+        # Deletes, per-row updates and inserts in a single transaction
+        conn = self.connection()
+        with conn:
+            if deleted:
+                self._delete(conn, key, deleted)
+            for row_key, values in updated.items():
+                self._update(conn, key, row_key, values)
+            if not added.empty:
+                columns, values = self._rows(key, added)
+                conn.executemany(self._insert_sql(key, columns), values)
+            self.bump_version(conn, key)
+
+# ==========================================
+# SHARED, PROCESS-WIDE FRAMES
+# ==========================================
+# One parsed copy of each table for every session in the process. get()
+# compares the backend's version stamp (file stat / version row) and only
+# re-reads after a change. Callers must treat the frames as read-only and
+# replace them (concat, data_editor output) rather than mutate in place.
+class SharedFrames:
+    def __init__(self, storage):
+        self.storage = storage
+        self.frames = {}
+        self.versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        version = self.storage.version(key)
+        with self._lock:
+            if key not in self.frames or self.versions.get(key) != version:
+                self.frames[key] = self.storage.load(key)
+                self.versions[key] = version
+            return self.frames[key]
+
+    def put(self, key, df):
+        # Called right after this process wrote df, so no re-read is needed
+        with self._lock:
+            self.frames[key] = df
+            self.versions[key] = self.storage.version(key)
+
+def open_storage(backend="csv", files=FILES, db_path=DEFAULT_DB_PATH):
+    if backend == "sqlite":
+        return SqliteStorage(db_path)
+    if backend == "csv":
+        return CsvStorage(files, SEQUENCE_FILE)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+# INTEGRATION_APP_STORAGE=sqlite switches from the CSV files in FILES to the
+# embedded database (run `python storage.py import` once to migrate).
+def storage_from_env():
+    backend = os.environ.get("INTEGRATION_APP_STORAGE", "csv")
+    db_path = os.environ.get("INTEGRATION_APP_DB", DEFAULT_DB_PATH)
+    return open_storage(backend, FILES, db_path)
+
+def import_csvs(db_path=DEFAULT_DB_PATH, files=FILES):
+    # One-shot migration: each existing CSV replaces the matching table
+    source = CsvStorage(files)
+    target = SqliteStorage(db_path)
+    counts = {}
+    for key, path in files.items():
+        if os.path.exists(path):
+            df = source.load(key)
+            target.save(key, df)
+            counts[key] = len(df)
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Integration APP storage tools")
+    parser.add_argument("command", choices=["import"], help="import: copy the CSV files into the SQLite database")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    for key, count in import_csvs(args.db).items():
+        print(f"Imported {count} rows into '{key}'")
+    print(f"Database ready at {args.db}")
@@ -0,0 +1,204 @@
+# %%
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from reporttracing import (KEYS_OF_INTEREST, analyze_multiple_pbip_folders, analyze_multiple_pbip_folders_incremental,
+                           extract_nodes_from_json, iter_nodes_from_json, stream_results_to_file)
+
+# Original recursive walker, kept only as the baseline for comparison
+def extract_nodes_recursive(data, keys_of_interest, found=None):
+    if found is None:
+        found = []
+    if isinstance(data, dict):
+        for k, v in data.items():
+            if k in keys_of_interest:
+                found.append((k, json.dumps(v, sort_keys=True)))
+            if isinstance(v, str):
+                try:
+                    nested = json.loads(v)
+                    extract_nodes_recursive(nested, keys_of_interest, found)
+                except:
+                    pass
+            else:
+                extract_nodes_recursive(v, keys_of_interest, found)
+    elif isinstance(data, list):
+        for item in data:
+            extract_nodes_recursive(item, keys_of_interest, found)
+    return found
+
+# --- SYNTHETIC PBIP PAYLOADS ---
+ENTITIES = ["Sales", "Fare", "Ridership", "Route", "Calendar", "Vehicle", "Stop", "Budget"]
+PROPERTIES = ["Amount", "Count", "Date", "Name", "Id", "Region", "Type", "Total"]
+
+def make_projection(rng):
+    entity = rng.choice(ENTITIES)
+    prop = rng.choice(PROPERTIES)
+    return {
+        "field": {"Column": {"Expression": {"SourceRef": {"Entity": entity}}, "Property": prop}},
+        "queryRef": f"{entity}.{prop}",
+        "displayName": f"{prop} of {entity}",
+        "active": True,
+    }
+
+def make_visual(rng, depth):
+    visual = {
+        "name": f"visual{rng.randrange(10**6)}",
+        "position": {"x": rng.random() * 1000, "y": rng.random() * 800, "z": 0},
+        "query": {"queryState": {"Values": {"projections": [make_projection(rng) for _ in range(4)]}}},
+        "title": "Plain text that is not JSON",
+        "objects": {"labels": [{"properties": {"color": "#FFFFFF", "fontSize": "12D"}}]},
+    }
+    # Deep chains of wrapper objects, as produced by nested filters/containers
+    node = visual
+    for level in range(depth):
+        child = {"level": level, "label": f"level {level}", "items": [make_projection(rng)]}
+        node["child"] = child
+        node = child
+    return visual
+
+def make_report(seed=0, visuals=200, depth=30):
+    rng = random.Random(seed)
+    sections = []
+    for i in range(visuals // 10):
+        containers = [{"config": json.dumps(make_visual(rng, depth)), "filters": "[]", "x": 0, "y": 0}
+                      for _ in range(10)]
+        sections.append({"displayName": f"Page {i}", "visualContainers": containers,
+                         "config": json.dumps({"layouts": [{"id": 0}]})})
+    return {"config": json.dumps({"version": "5.43", "themeCollection": {}}), "sections": sections}
+
+def time_call(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_walker(visuals=200, depth=30, seed=0, repeats=5):
+    payload = make_report(seed, visuals, depth)
+    baseline = extract_nodes_recursive(payload, KEYS_OF_INTEREST)
+    assert extract_nodes_from_json(payload, KEYS_OF_INTEREST) == baseline
+    old = time_call(lambda: extract_nodes_recursive(payload, KEYS_OF_INTEREST), repeats)
+    new = time_call(lambda: list(iter_nodes_from_json(payload, KEYS_OF_INTEREST)), repeats)
+    print(f"walker visuals={visuals} depth={depth} matches={len(baseline)}: "
+          f"recursive {old * 1000:.1f} ms, iterative {new * 1000:.1f} ms ({old / new:.1f}x)")
+    return [result("walker", old, visuals=visuals, depth=depth, variant="recursive"),
+            result("walker", new, visuals=visuals, depth=depth, variant="iterative")]
+
+def bench_deep_nesting(depth=5000):
+    payload = current = {}
+    for _ in range(depth):
+        current["child"] = {"Entity": "Deep"}
+        current = current["child"]
+    try:
+        extract_nodes_recursive(payload, KEYS_OF_INTEREST)
+        print(f"deep nesting depth={depth}: recursive ok")
+    except RecursionError:
+        print(f"deep nesting depth={depth}: recursive hit RecursionError (limit {sys.getrecursionlimit()})")
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_nodes_from_json(payload, KEYS_OF_INTEREST))
+    seconds = time.perf_counter() - start
+    print(f"deep nesting depth={depth}: iterative found {count} matches")
+    return [result("deep_nesting", seconds, depth=depth, variant="iterative", matches=count)]
+
+# --- SYNTHETIC PBIP FOLDER TREES ---
+# One "<name>.Report" folder per report, each with a report.json holding
+# stringified visual configs (depth varies per report) and a few small
+# definition files, like a PBIP project exported from Power BI Desktop.
+def write_pbip_tree(parent, reports=8, visuals=200, depth=30, seed=0):
+    rng = random.Random(seed)
+    total_bytes = 0
+    for i in range(reports):
+        report_dir = os.path.join(parent, f"Report {i}.Report")
+        definition_dir = os.path.join(report_dir, "definition")
+        os.makedirs(definition_dir, exist_ok=True)
+        files = {
+            os.path.join(report_dir, "report.json"): make_report(seed * 1000 + i, visuals, rng.randint(max(1, depth // 2), depth)),
+            os.path.join(report_dir, "definition.pbir"): {"version": "1.0"},
+            os.path.join(definition_dir, "version.json"): {"version": "1.0.0"},
+            os.path.join(definition_dir, "bookmarks.json"): {"items": [{"queryRef": f"{rng.choice(ENTITIES)}.{rng.choice(PROPERTIES)}"}]},
+        }
+        for path, payload in files.items():
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            total_bytes += os.path.getsize(path)
+    return total_bytes
+
+def bench_scan(reports=8, visuals=200, depth=30, seed=0, workers=None):
+    workers = workers or os.cpu_count()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        parent = os.path.join(tmp, "reports")
+        total_bytes = write_pbip_tree(parent, reports, visuals, depth, seed)
+        params = {"reports": reports, "visuals": visuals, "depth": depth, "bytes": total_bytes}
+        runs = {
+            "serial": lambda: analyze_multiple_pbip_folders(parent),
+            f"parallel_{workers}": lambda: analyze_multiple_pbip_folders(parent, workers=workers),
+            f"per_file_{workers}": lambda: analyze_multiple_pbip_folders(parent, workers=workers, per_file=True),
+            "stream_csv": lambda: stream_results_to_file(parent, os.path.join(tmp, "out.csv")),
+        }
+        for variant, run in runs.items():
+            seconds = time_call(run, 1)
+            results.append(result("scan", seconds, variant=variant, **params))
+        manifest = os.path.join(tmp, "manifest.json")
+        for variant in ("incremental_cold", "incremental_warm"):
+            seconds = time_call(lambda: analyze_multiple_pbip_folders_incremental(parent, manifest, workers=workers), 1)
+            results.append(result("scan", seconds, variant=variant, **params))
+    print(f"scan reports={reports} visuals={visuals} depth={depth} ({total_bytes / 1024 / 1024:.1f} MiB): "
+          + ", ".join(f"{r['variant']} {r['ms']:.0f} ms" for r in results))
+    return results
+
+# --- MACHINE-READABLE RESULTS ---
+def result(benchmark, seconds, **params):
+    return {"benchmark": benchmark, **params, "ms": round(seconds * 1000, 3)}
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def write_results(results, path, seed):
+    payload = {
+        "tool": "ReportTracing",
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "seed": seed,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
+
+SUITES = ["walker", "deep", "scan"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ReportTracing benchmarks on seeded synthetic PBIP payloads")
+    parser.add_argument("suites", nargs="*", choices=SUITES, help="default: all")
+    parser.add_argument("--reports", type=int, nargs="+", default=[4, 16, 64], help="report folder counts for the scan suite")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic PBIP generator")
+    parser.add_argument("--output", help="write JSON results to this path")
+    args = parser.parse_args()
+    suites = args.suites or SUITES
+
+    results = []
+    if "walker" in suites:
+        for visuals, depth in [(50, 5), (200, 30), (500, 60)]:
+            results += bench_walker(visuals, depth, args.seed)
+    if "deep" in suites:
+        results += bench_deep_nesting()
+    if "scan" in suites:
+        for reports in args.reports:
+            results += bench_scan(reports, seed=args.seed)
+    if args.output:
+        write_results(results, args.output, args.seed)
@@ -3,25 +3,70 @@
 import os
 import json
 import csv
+import gzip
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+KEYS_OF_INTEREST = {"Entity", "Property", "queryRef"}
+MANIFEST_VERSION = 1
+
+def canonical_value(v, dumps_cache):
+    # Entity/Property/queryRef values are almost always short strings that
+    # repeat across every visual, so their serialization is memoized.
+    if type(v) is str:
+        dumped = dumps_cache.get(v)
+        if dumped is None:
+            dumped = dumps_cache[v] = json.dumps(v)
+        return dumped
+    return json.dumps(v, sort_keys=True)
+
+def iter_nodes_from_json(data, keys_of_interest, dumps_cache=None, nested_cache=None):
+    if dumps_cache is None:
+        dumps_cache = {}
+    if nested_cache is None:
+        nested_cache = {}
+    if isinstance(data, dict):
+        stack = [iter(data.items())]
+    elif isinstance(data, list):
+        stack = [zip(repeat(None), data)]
+    else:
+        return
+
+    # Explicit stack of iterators: same pre-order as the old recursive walk,
+    # without the recursion limit. List items carry key None.
+    while stack:
+        for k, v in stack[-1]:
+            if k is not None and k in keys_of_interest:
+                yield k, canonical_value(v, dumps_cache)
+            if isinstance(v, dict):
+                stack.append(iter(v.items()))
+                break
+            if isinstance(v, list):
+                stack.append(zip(repeat(None), v))
+                break
+            # Stringified JSON (PBIP "config", "filters", ...) is only decoded
+            # when it looks like an object/array, and identical strings are
+            # walked once per file.
+            if k is not None and isinstance(v, str):
+                stripped = v.lstrip()
+                if stripped[:1] not in ("{", "["):
+                    continue
+                matches = nested_cache.get(v)
+                if matches is None:
+                    try:
+                        nested = json.loads(v)
+                    except (ValueError, RecursionError):
+                        nested = None
+                    matches = nested_cache[v] = list(iter_nodes_from_json(nested, keys_of_interest, dumps_cache, nested_cache))
+                yield from matches
+        else:
+            stack.pop()
 
 def extract_nodes_from_json(data, keys_of_interest, found=None):
     if found is None:
         found = []
-    if isinstance(data, dict):
-        for k, v in data.items():
-            if k in keys_of_interest:
-                found.append((k, json.dumps(v, sort_keys=True)))
-            if isinstance(v, str):
-                try:
-                    nested = json.loads(v)
-                    extract_nodes_from_json(nested, keys_of_interest, found)
-                except:
-                    pass
-            else:
-                extract_nodes_from_json(v, keys_of_interest, found)
-    elif isinstance(data, list):
-        for item in data:
-            extract_nodes_from_json(item, keys_of_interest, found)
+    found.extend(iter_nodes_from_json(data, keys_of_interest))
     return found
 
 def clean_root_folder_name(folder_name):
@@ -29,34 +74,167 @@ def clean_root_folder_name(folder_name):
         return folder_name[:-7]  # Remove last 7 chars, i.e., ".Report"
     return folder_name
 
-def analyze_multiple_pbip_folders(parent_folder):
-    keys_of_interest = {"Entity", "Property", "queryRef"}
+def extract_nodes_from_file(filepath, keys_of_interest):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+    return iter_nodes_from_json(json_data, keys_of_interest)
+
+def list_report_folders(parent_folder):
+    return [name for name in os.listdir(parent_folder)
+            if os.path.isdir(os.path.join(parent_folder, name))]
+
+def list_json_files(root_folder_path):
+    for dirpath, _, filenames in os.walk(root_folder_path):
+        for filename in filenames:
+            if filename.lower().endswith(".json"):
+                yield os.path.join(dirpath, filename)
+
+def list_file_tasks(parent_folder, keys_of_interest):
+    # One scan_json_file task per JSON file of every report folder
+    return [(clean_root_folder_name(name), name, filepath, keys_of_interest)
+            for name in list_report_folders(parent_folder)
+            for filepath in list_json_files(os.path.join(parent_folder, name))]
+
+# Workers return (items, errors) instead of printing so the parent process
+# can merge every result into a single dedup set. Each error is
+# (filepath, exception type name, message).
+def scan_json_file(task):
+    clean_name, root_folder_name, filepath, keys_of_interest = task
+    items = set()
+    errors = []
+    try:
+        for k, v in extract_nodes_from_file(filepath, keys_of_interest):
+            items.add((clean_name, root_folder_name, k, v))
+    except Exception as e:
+        errors.append((filepath, type(e).__name__, str(e)))
+    return items, errors
+
+def scan_report_folder(task):
+    parent_folder, root_folder_name, keys_of_interest = task
+    clean_name = clean_root_folder_name(root_folder_name)
+    items = set()
+    errors = []
+    for filepath in list_json_files(os.path.join(parent_folder, root_folder_name)):
+        file_items, file_errors = scan_json_file((clean_name, root_folder_name, filepath, keys_of_interest))
+        items |= file_items
+        errors.extend(file_errors)
+    return items, errors
+
+def run_scan_tasks(scan, tasks, workers=None):
+    if workers and workers > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(scan, tasks, chunksize=chunksize))
+    return map(scan, tasks)
+
+def analyze_multiple_pbip_folders(parent_folder, workers=None, per_file=False):
+    keys_of_interest = KEYS_OF_INTEREST
     unique_items = set()
 
-    for root_folder_name in os.listdir(parent_folder):
-        root_folder_path = os.path.join(parent_folder, root_folder_name)
-        if os.path.isdir(root_folder_path):
-            clean_name = clean_root_folder_name(root_folder_name)
-            for dirpath, _, filenames in os.walk(root_folder_path):
-                for filename in filenames:
-                    if filename.lower().endswith(".json"):
-                        filepath = os.path.join(dirpath, filename)
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                json_data = json.load(f)
-                            found_nodes = extract_nodes_from_json(json_data, keys_of_interest)
-                            for k, v in found_nodes:
-                                unique_items.add((clean_name, root_folder_name, k, v))
-                        except Exception as e:
-                            print(f"Error processing {filepath}: {e}")
-
-    # Convert set to list of dicts for CSV export
+    # workers=None or 1 keeps the original single-core scan.
+    # per_file=True spreads individual JSON files instead of whole reports,
+    # which balances better when one report is much larger than the others.
+    if per_file:
+        tasks = list_file_tasks(parent_folder, keys_of_interest)
+        scan = scan_json_file
+    else:
+        tasks = [(parent_folder, name, keys_of_interest) for name in list_report_folders(parent_folder)]
+        scan = scan_report_folder
+
+    partials = run_scan_tasks(scan, tasks, workers)
+    for items, errors in partials:
+        unique_items |= items
+        for filepath, _, message in errors:
+            print(f"Error processing {filepath}: {message}")
+
+    return items_to_rows(unique_items)
+
+# Sorted so serial, parallel and incremental runs write identical CSVs
+def items_to_rows(unique_items):
     results = []
-    for root, folder, node, value in unique_items:
+    for root, folder, node, value in sorted(unique_items):
         results.append({"root": root, "folder": folder, "node": node, "value": value})
-
     return results
 
+# --- INCREMENTAL SCAN (FILE FINGERPRINT MANIFEST) ---
+def hash_file(filepath, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path, keys_of_interest):
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A different key set or format means every cached node list is stale
+    if manifest.get("version") != MANIFEST_VERSION or set(manifest.get("keys", [])) != set(keys_of_interest):
+        return {}
+    return manifest.get("files", {})
+
+def save_manifest(files, manifest_path, keys_of_interest):
+    manifest = {"version": MANIFEST_VERSION, "keys": sorted(keys_of_interest), "files": files}
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+def analyze_multiple_pbip_folders_incremental(parent_folder, manifest_path, workers=None):
+    keys_of_interest = KEYS_OF_INTEREST
+    cached = load_manifest(manifest_path, keys_of_interest)
+    files = {}
+    pending = []
+    reused = rehashed = 0
+
+    for root_folder_name in list_report_folders(parent_folder):
+        clean_name = clean_root_folder_name(root_folder_name)
+        for filepath in list_json_files(os.path.join(parent_folder, root_folder_name)):
+            rel_path = os.path.relpath(filepath, parent_folder)
+            stat = os.stat(filepath)
+            entry = cached.get(rel_path)
+            # Same mtime and size: trust the cache without reading the file
+            if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                files[rel_path] = entry
+                reused += 1
+                continue
+            # Touched but unchanged content (e.g. git checkout): refresh the stamp only
+            digest = hash_file(filepath)
+            if entry and entry["sha256"] == digest:
+                files[rel_path] = dict(entry, mtime=stat.st_mtime_ns, size=stat.st_size)
+                rehashed += 1
+                continue
+            pending.append((rel_path, stat, digest, (clean_name, root_folder_name, filepath, keys_of_interest)))
+
+    partials = run_scan_tasks(scan_json_file, [task for *_, task in pending], workers)
+    for (rel_path, stat, digest, task), (items, errors) in zip(pending, partials):
+        if errors:
+            # Not cached, so the file is retried on the next run
+            for filepath, _, message in errors:
+                print(f"Error processing {filepath}: {message}")
+            continue
+        files[rel_path] = {
+            "root": task[0],
+            "folder": task[1],
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "nodes": sorted([node, value] for _, _, node, value in items),
+        }
+
+    # Files missing from this walk are dropped along with their rows
+    removed = len(set(cached) - set(files))
+    save_manifest(files, manifest_path, keys_of_interest)
+    print(f"Manifest: {reused} unchanged, {rehashed} re-stamped, {len(pending)} parsed, {removed} removed")
+
+    unique_items = set()
+    for entry in files.values():
+        for node, value in entry["nodes"]:
+            unique_items.add((entry["root"], entry["folder"], node, value))
+    return items_to_rows(unique_items)
+
 def save_results_to_csv(data, output_file):
     with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
         fieldnames = ['root', 'folder', 'node', 'value']
@@ -65,13 +243,95 @@ def save_results_to_csv(data, output_file):
         for row in data:
             writer.writerow(row)
 
-# Example usage
+# --- STREAMING PIPELINE ---
+FIELDNAMES = ['root', 'folder', 'node', 'value']
+
+def iter_pbip_items(parent_folder, keys_of_interest=KEYS_OF_INTEREST):
+    for root_folder_name in list_report_folders(parent_folder):
+        clean_name = clean_root_folder_name(root_folder_name)
+        for filepath in list_json_files(os.path.join(parent_folder, root_folder_name)):
+            try:
+                nodes = list(extract_nodes_from_file(filepath, keys_of_interest))
+            except Exception as e:
+                print(f"Error processing {filepath}: {e}")
+                continue
+            for k, v in nodes:
+                yield (clean_name, root_folder_name, k, v)
+
+# The seen-set keeps a 64-bit digest per row instead of the row itself,
+# so memory grows by a small int per unique row rather than four strings.
+def item_digest(item):
+    return int.from_bytes(hashlib.blake2b("\x1f".join(item).encode('utf-8'), digest_size=8).digest(), 'big')
+
+def iter_unique_items(items):
+    seen = set()
+    for item in items:
+        digest = item_digest(item)
+        if digest not in seen:
+            seen.add(digest)
+            yield item
+
+def iter_batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_csv_batches(batches, output_file, compress=False):
+    opener = gzip.open if compress else open
+    count = 0
+    with opener(output_file, 'wt', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(FIELDNAMES)
+        for batch in batches:
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+def write_parquet_batches(batches, output_file):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+    schema = pa.schema([(name, pa.string()) for name in FIELDNAMES])
+    count = 0
+    with pq.ParquetWriter(output_file, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays([pa.array(col, pa.string()) for col in columns], schema=schema))
+            count += len(batch)
+    return count
+
+def infer_output_format(output_file):
+    lowered = output_file.lower()
+    return "parquet" if lowered.endswith(".parquet") else "csv.gz" if lowered.endswith(".gz") else "csv"
+
+def stream_results_to_file(parent_folder, output_file, fmt=None, batch_size=5000):
+    # fmt: "csv", "csv.gz" or "parquet"; inferred from the extension when omitted.
+    # Rows are written in scan order (not sorted) as soon as a batch fills up.
+    fmt = fmt or infer_output_format(output_file)
+    batches = iter_batches(iter_unique_items(iter_pbip_items(parent_folder)), batch_size)
+    if fmt == "parquet":
+        return write_parquet_batches(batches, output_file)
+    if fmt in ("csv", "csv.gz"):
+        return write_csv_batches(batches, output_file, compress=(fmt == "csv.gz"))
+    raise ValueError(f"Unsupported output format: {fmt}")
+
+# Example usage (scan_service.py adds a CLI with configurable paths, progress
+# and structured errors, and can run the scan in the background)
 if __name__ == "__main__":
     parent_folder_path = "reports"
     output_csv_path = "extracted_metadata.csv"
-    results = analyze_multiple_pbip_folders(parent_folder_path)
+    manifest_path = "extracted_metadata.manifest.json"
+    workers = os.cpu_count()
+    results = analyze_multiple_pbip_folders_incremental(parent_folder_path, manifest_path, workers=workers)
     save_results_to_csv(results, output_csv_path)
-    print(f"Analyzed parent folder: {os.path.basename(parent_folder_path)}")
+    print(f"Analyzed parent folder: {os.path.basename(parent_folder_path)} ({workers} workers)")
     print(f"Total unique items found: {len(results)}")
     print(f"Results saved to {output_csv_path}")
 
@@ -0,0 +1,251 @@
+# %%
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from reporttracing import (FIELDNAMES, KEYS_OF_INTEREST, infer_output_format, items_to_rows, iter_batches,
+                           list_file_tasks, scan_json_file, write_csv_batches, write_parquet_batches)
+
+# ==========================================
+# BACKGROUND SCAN SERVICE
+# ==========================================
+# A scan runs on its own thread and hands JSON files to a process (or
+# thread) pool in small chunks. The caller gets a ScanJob right away: its
+# future resolves to the result, progress can be polled at any time and
+# cancel() stops the scan between chunks. Bad files are collected as
+# structured errors instead of being printed.
+OUTPUT_FORMATS = ["csv", "csv.gz", "parquet"]
+FILES_PER_CHUNK = 8
+
+def file_size(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+def plan_scan(parent_folder, keys_of_interest):
+    # The per-file tasks of reporttracing, each paired with its size for progress
+    return [(task, file_size(task[2])) for task in list_file_tasks(parent_folder, keys_of_interest)]
+
+def scan_chunk(chunk):
+    # Worker side: [(items, error or None, size)] per file
+    results = []
+    for task, size in chunk:
+        clean_name, folder = task[0], task[1]
+        items, errors = scan_json_file(task)
+        error = None
+        for filepath, error_type, message in errors:
+            error = {"root": clean_name, "folder": folder, "path": filepath,
+                     "error": error_type, "message": message}
+        results.append((items, error, size))
+    return results
+
+def ignore_sigint():
+    # Pool initializer: Ctrl+C reaches the whole process group, but only the
+    # parent should react to it (by cancelling the job between chunks)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def write_rows(rows, output_file, fmt=None):
+    # Written next to the target and swapped in, so readers (the Integration
+    # APP watches this file) never see a half-written scan
+    fmt = fmt or infer_output_format(output_file)
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    tmp_path = output_file + ".tmp"
+    batches = iter_batches(([row[name] for name in FIELDNAMES] for row in rows), 5000)
+    if fmt == "parquet":
+        write_parquet_batches(batches, tmp_path)
+    else:
+        write_csv_batches(batches, tmp_path, compress=(fmt == "csv.gz"))
+    os.replace(tmp_path, output_file)
+
+class ScanProgress:
+    def __init__(self):
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_read = 0
+        self.items_found = 0
+        self.errors = []
+        self.started = None
+        self.finished = None
+        self.state = "pending"
+        self._lock = threading.Lock()
+
+    def add(self, files, size, items, error):
+        with self._lock:
+            self.files_done += files
+            self.bytes_read += size
+            self.items_found = items
+            if error is not None:
+                self.errors.append(error)
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = self.elapsed()
+            return {
+                "state": self.state,
+                "files_done": self.files_done,
+                "files_total": self.files_total,
+                "bytes_read": self.bytes_read,
+                "bytes_total": self.bytes_total,
+                "unique_items": self.items_found,
+                "errors": len(self.errors),
+                "elapsed_s": round(elapsed, 3),
+                "files_per_s": round(self.files_done / elapsed, 1) if elapsed else 0.0,
+                "mb_per_s": round(self.bytes_read / elapsed / 1e6, 2) if elapsed else 0.0,
+                "fraction": self.bytes_read / self.bytes_total if self.bytes_total else (1.0 if self.finished else 0.0),
+            }
+
+class ScanJob:
+    def __init__(self, parent_folder, output_file=None, fmt=None, keys_of_interest=KEYS_OF_INTEREST,
+                 workers=None, use_processes=True):
+        self.parent_folder = parent_folder
+        self.output_file = output_file
+        self.fmt = fmt
+        self.keys_of_interest = set(keys_of_interest)
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.progress = ScanProgress()
+        self.future = None
+        self._cancel = threading.Event()
+        self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-scan")
+
+    def start(self):
+        self.future = self._runner.submit(self._run)
+        self._runner.shutdown(wait=False)
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def _pool(self):
+        if self.use_processes and self.workers > 1:
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_sigint)
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _run(self):
+        progress = self.progress
+        progress.started = time.time()
+        progress.state = "running"
+        try:
+            tasks = plan_scan(self.parent_folder, self.keys_of_interest)
+            progress.files_total = len(tasks)
+            progress.bytes_total = sum(size for _, size in tasks)
+            chunks = [tasks[i:i + FILES_PER_CHUNK] for i in range(0, len(tasks), FILES_PER_CHUNK)]
+            unique_items = set()
+            pool = self._pool()
+            try:
+                # Keep a bounded window in flight so cancel() takes effect quickly
+                pending = set()
+                remaining = iter(chunks)
+                window = self.workers * 2
+                while True:
+                    while len(pending) < window and not self._cancel.is_set():
+                        chunk = next(remaining, None)
+                        if chunk is None:
+                            break
+                        pending.add(pool.submit(scan_chunk, chunk))
+                    if not pending:
+                        break
+                    finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        for items, error, size in future.result():
+                            unique_items |= items
+                            progress.add(1, size, len(unique_items), error)
+                    if self._cancel.is_set():
+                        for future in pending:
+                            future.cancel()
+                        raise CancelledError()
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+            # A cancel that lands once nothing is in flight ends the loop
+            # normally; it must still never overwrite the output file
+            if self._cancel.is_set():
+                raise CancelledError()
+
+            rows = items_to_rows(unique_items)
+            if self.output_file:
+                write_rows(rows, self.output_file, self.fmt)
+            progress.state = "finished"
+            return {"rows": rows, "errors": list(progress.errors), "output_file": self.output_file}
+        except CancelledError:
+            progress.state = "cancelled"
+            raise
+        except BaseException:
+            progress.state = "failed"
+            raise
+        finally:
+            progress.finished = time.time()
+
+def start_scan(parent_folder, output_file=None, fmt=None, keys_of_interest=KEYS_OF_INTEREST, workers=None, use_processes=True):
+    return ScanJob(parent_folder, output_file, fmt, keys_of_interest, workers, use_processes).start()
+
+def scan(parent_folder, output_file=None, fmt=None, keys_of_interest=KEYS_OF_INTEREST, workers=None, use_processes=True):
+    # Blocking convenience wrapper
+    return start_scan(parent_folder, output_file, fmt, keys_of_interest, workers, use_processes).result()
+
+def format_progress(snapshot):
+    return (f"{snapshot['files_done']}/{snapshot['files_total']} files, "
+            f"{snapshot['bytes_read'] / 1e6:.1f}/{snapshot['bytes_total'] / 1e6:.1f} MB, "
+            f"{snapshot['mb_per_s']:.1f} MB/s, {snapshot['errors']} errors")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan PBIP report folders for Entity/Property/queryRef usage")
+    parser.add_argument("parent_folder", nargs="?", default="reports", help="folder holding one sub-folder per report")
+    parser.add_argument("-o", "--output", default="extracted_metadata.csv", help="output file (.csv, .csv.gz or .parquet)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="output format (default: from the extension)")
+    parser.add_argument("--keys", nargs="+", default=sorted(KEYS_OF_INTEREST), help="JSON keys to extract")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="parallel workers")
+    parser.add_argument("--threads", action="store_true", help="use threads instead of processes")
+    parser.add_argument("--errors", help="write per-file errors to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.parent_folder):
+        parser.error(f"report folder not found: {args.parent_folder}")
+
+    job = start_scan(args.parent_folder, args.output, args.format, args.keys, args.workers, not args.threads)
+    try:
+        while not job.done():
+            print("\r" + format_progress(job.progress.snapshot()), end="", file=sys.stderr, flush=True)
+            time.sleep(0.5)
+        result = job.result()
+    except KeyboardInterrupt:
+        job.cancel()
+        print("\nCancelling...", file=sys.stderr)
+        try:
+            job.result()
+        except (CancelledError, KeyboardInterrupt):
+            pass
+        except Exception as e:
+            print(f"Scan failed while cancelling: {e}", file=sys.stderr)
+        sys.exit(130)
+    print("\r" + format_progress(job.progress.snapshot()), file=sys.stderr)
+
+    for error in result["errors"]:
+        print(f"Error processing {error['path']}: {error['error']}: {error['message']}")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            json.dump(result["errors"], f, indent=2)
+    print(f"Total unique items found: {len(result['rows'])}")
+    print(f"Results saved to {args.output}")